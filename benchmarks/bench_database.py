@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.database import DatabaseManager
+from modules.importer import import_records, synthetic_records
+
+# --- DATABASE MICRO-BENCHMARKS ---
+# Builds synthetic hospital databases (one patient + one booking per record)
+# in a temp directory and times each DatabaseManager query with the read
+# cache cleared, so the numbers are what SQLite itself costs.
+#
+#   python benchmarks/bench_database.py                    compare to baseline
+#   python benchmarks/bench_database.py --update-baseline  store a new baseline
+#   python benchmarks/bench_database.py --sizes 1000 --threshold 0.5
+#
+# Exit status 1 means at least one query regressed past the threshold.
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_baseline.json")
+HISTORY_LIMIT = 50
+
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+def time_query(fn, db, min_runs=20, max_runs=500, budget=2.0):
+    # Repeats fn until max_runs or the time budget is spent (at least min_runs)
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < max_runs:
+        db.invalidate_cache()
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+        if len(samples) >= min_runs and time.perf_counter() - start > budget:
+            break
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "p99": round(percentile(samples, 99), 4),
+    }
+
+def build_queries(db, size):
+    rnd = random.Random(42)
+    doc_id = db.get_doctor()[0]
+    # Keyset cursor roughly in the middle of the schedule
+    mid = db.get_connection().execute(
+        'SELECT op_date, id FROM operations WHERE doctor_id = ? ORDER BY op_date, id LIMIT 1 OFFSET ?',
+        (doc_id, size // 2)).fetchone()
+    return {
+        "get_doctor": lambda: db.get_doctor(),
+        "get_patients": lambda: db.get_patients(),
+        "get_patient_details": lambda: db.get_patient_details(rnd.randint(1, size)),
+        "get_operations": lambda: db.get_operations(doc_id),
+        "get_operations_page_first": lambda: db.get_operations_page(doc_id),
+        "get_operations_page_deep": lambda: db.get_operations_page(doc_id, after=tuple(mid)),
+        "get_operations_page_filtered": lambda: db.get_operations_page(doc_id, filter_text="Crani"),
+        "search_patients": lambda: db.search_patients("allerg"),
+        "add_patient": lambda: db.add_patient("Bench Patient", 40, "Penicillin allergy"),
+    }
+
+def run_size(size, budget):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        t = time.perf_counter()
+        report = import_records(db, synthetic_records(size))
+        print(f"[{size:,}] populated in {time.perf_counter() - t:.1f}s ({report.rows_per_sec:,.0f} rows/s)")
+        db.get_connection().execute("ANALYZE")
+        results = {}
+        for name, fn in build_queries(db, size).items():
+            results[name] = time_query(fn, db, budget=budget)
+            r = results[name]
+            print(f"  {name:<30} p50 {r['p50']:>10.3f} ms  p95 {r['p95']:>10.3f} ms  p99 {r['p99']:>10.3f} ms  ({r['runs']} runs)")
+        db.close()
+    return results
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {"baseline": {}, "history": []}
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline, results, metric, threshold, min_delta_ms):
+    # Returns [(size, query, old, new)] for queries slower than old * (1 + threshold).
+    # Slowdowns under min_delta_ms are timer noise on sub-millisecond queries.
+    regressions = []
+    for size, queries in results.items():
+        for name, r in queries.items():
+            old = baseline.get(size, {}).get(name)
+            if not old:
+                continue
+            if r[metric] > old[metric] * (1 + threshold) and r[metric] - old[metric] >= min_delta_ms:
+                regressions.append((size, name, old[metric], r[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time DatabaseManager queries at realistic data volumes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--metric", choices=["p50", "p95", "p99"], default="p95")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds spent timing each query")
+    args = parser.parse_args(argv)
+
+    results = {str(size): run_size(size, args.budget) for size in args.sizes}
+    data = load_baseline(args.baseline)
+    entry = {"commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"), "results": results}
+    data["history"] = (data.get("history", []) + [entry])[-HISTORY_LIMIT:]
+
+    regressions = compare(data.get("baseline", {}), results, args.metric, args.threshold, args.min_delta_ms)
+    if args.update_baseline:
+        data["baseline"] = results
+        data["baseline_commit"] = entry["commit"]
+    with open(args.baseline, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+    if regressions and not args.update_baseline:
+        print(f"\n{len(regressions)} regression(s) past {args.threshold:.0%} on {args.metric}:")
+        for size, name, old, new in regressions:
+            print(f"  [{int(size):,}] {name}: {old:.3f} ms -> {new:.3f} ms ({new / old - 1:+.0%})")
+        return 1
+    print("\nNo regressions." if not args.update_baseline else f"\nBaseline written to {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ import sys
 from PyQt6.QtWidgets import QApplication
 from ui.splash import SplashScreen
 from ui.mainwindow import MainWindow
+from modules.database import DatabaseManager
+from modules.executor import QueryExecutor
+from modules.audit import AuditLog
 
 class AppController:
     def __init__(self):
@@ -15,6 +18,17 @@ class AppController:
         except FileNotFoundError:
             print("Warning: style.qss not found.")
 
+        # Schema migrations run here, once, synchronously and before the
+        # splash is shown; the main window opens when the splash's timer ends
+        self.db = DatabaseManager()
+        self.executor = QueryExecutor(self.db)
+        self.audit = AuditLog(self.db)
+        # Drain in-flight queries and buffered audit events before the
+        # connections go away
+        self.app.aboutToQuit.connect(self.executor.shutdown)
+        self.app.aboutToQuit.connect(self.audit.close)
+        self.app.aboutToQuit.connect(self.db.close)
+
         self.start_splash()
 
     def start_splash(self):
@@ -23,7 +37,7 @@ class AppController:
         self.splash.show()
 
     def start_main(self):
-        self.main_window = MainWindow()
+        self.main_window = MainWindow(self.db, self.executor, self.audit)
         self.main_window.show()
 
     def run(self):
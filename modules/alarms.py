@@ -0,0 +1,272 @@
+import atexit
+import threading
+import time
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# --- ALARMS ---
+# Every monitored parameter of every bed is a cell of a (beds, params) grid.
+# Sensors write the latest values into the grid from any thread; an engine
+# thread evaluates the whole grid a few times a second in one vectorized
+# pass:
+#
+#   limit check    value above high / below low; once alarming, the limit is
+#                  relaxed by the hysteresis so noise around it doesn't flap
+#   delay          the violation must persist `delay` seconds to annunciate
+#   latching       a latching alarm stays up after the condition clears,
+#                  until acknowledged
+#   acknowledge    silences an alarm for the episode it was given for: an
+#                  acknowledged alarm goes away when its condition clears,
+#                  and every new violation annunciates afresh
+#   escalation     an alarm left unacknowledged for ESCALATE_AFTER seconds
+#                  goes up one priority
+#   technical      a stale (disconnected) sensor raises its own alarm and
+#                  suppresses the limit checks of its parameter
+#
+# Only the list of annunciated alarms crosses back to the GUI thread, and
+# only when it changes, so the display pays nothing per tick.
+
+LOW, MEDIUM, HIGH = 1, 2, 3
+
+# Alarm kinds
+ABOVE, BELOW, TECHNICAL = 1, -1, 2
+
+class AlarmLimit:
+    def __init__(self, low=None, high=None, hysteresis=0.0, delay=0.0, priority=MEDIUM,
+                 latching=False, sensor=None, technical_priority=LOW, label=None, message=None):
+        self.low = low
+        self.high = high
+        self.hysteresis = hysteresis
+        self.delay = delay
+        self.priority = priority
+        self.latching = latching
+        self.sensor = sensor # raises "<sensor> disconnected" when stale
+        self.technical_priority = technical_priority
+        self.label = label
+        self.message = message # replaces "<label> HIGH > <limit>" / "LOW < <limit>"
+
+# Adult defaults for the bedside monitor
+DEFAULT_LIMITS = {
+    "HR": AlarmLimit(50, 120, hysteresis=5, delay=5, priority=MEDIUM, sensor="ECG leads"),
+    # 1 while the beat detector has seen no R wave for its asystole window
+    "Asystole": AlarmLimit(high=0.5, priority=HIGH, latching=True, message="ASYSTOLE"),
+    "SpO2": AlarmLimit(90, None, hysteresis=1, delay=10, priority=HIGH, latching=True,
+                       sensor="SpO2 probe", technical_priority=MEDIUM),
+    "NIBP_SYS": AlarmLimit(90, 160, hysteresis=5, priority=MEDIUM, label="NIBP sys"),
+    "NIBP_DIA": AlarmLimit(50, 100, hysteresis=5, priority=LOW, label="NIBP dia"),
+    "MAP": AlarmLimit(65, 110, hysteresis=3, priority=MEDIUM, sensor="NIBP cuff"),
+    "Resp": AlarmLimit(8, 30, hysteresis=2, delay=10, priority=MEDIUM, sensor="Resp sensor"),
+    "Temp": AlarmLimit(35.5, 38.5, hysteresis=0.2, delay=30, priority=LOW, sensor="Forehead thermometer"),
+}
+
+class Alarm:
+    def __init__(self, bed, field, kind, priority, acked, latched, limit):
+        self.bed = bed
+        self.field = field
+        self.kind = kind
+        self.priority = priority
+        self.acked = acked
+        self.latched = latched # condition cleared, shown until acknowledged
+        self.limit = limit
+
+    @property
+    def key(self):
+        return (self.bed, self.field, self.kind, self.priority, self.acked, self.latched)
+
+    @property
+    def message(self):
+        if self.kind == TECHNICAL:
+            return f"{self.limit.sensor} disconnected"
+        if self.limit.message:
+            return self.limit.message
+        name = self.limit.label or self.field
+        if self.kind == ABOVE:
+            return f"{name} HIGH > {self.limit.high:g}"
+        return f"{name} LOW < {self.limit.low:g}"
+
+class AlarmEngine(QObject):
+    changed = pyqtSignal(list) # annunciated [Alarm], most urgent first
+    ESCALATE_AFTER = 120.0 # s unacknowledged before going up a priority
+
+    def __init__(self, beds=1, limits=None, interval=0.25, parent=None):
+        super().__init__(parent)
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.fields = list(self.limits)
+        self.columns = {f: i for i, f in enumerate(self.fields)}
+        self.beds = beds
+        self.interval = interval
+        shape = (beds, len(self.fields))
+        specs = [self.limits[f] for f in self.fields]
+
+        # Per-parameter configuration, broadcast over beds
+        self.low = np.array([-np.inf if s.low is None else s.low for s in specs])
+        self.high = np.array([np.inf if s.high is None else s.high for s in specs])
+        self.hysteresis = np.array([s.hysteresis for s in specs], dtype=np.float64)
+        self.delay = np.array([s.delay for s in specs], dtype=np.float64)
+        self.priority = np.array([s.priority for s in specs], dtype=np.int8)
+        self.latching = np.array([s.latching for s in specs])
+        self.has_sensor = np.array([s.sensor is not None for s in specs])
+        self.technical_priority = np.array([s.technical_priority for s in specs], dtype=np.int8)
+
+        # Inputs, written from any thread under the lock
+        self._lock = threading.Lock()
+        self._values = np.full(shape, np.nan)
+        self._stale = np.zeros(shape, dtype=bool)
+        self._acks = [] # beds (or None for all) to acknowledge on the next tick
+
+        # Engine state, owned by the engine thread
+        self.kind = np.zeros(shape, dtype=np.int8)      # active ABOVE / BELOW / 0
+        self.pending = np.zeros(shape, dtype=np.int8)   # violation being timed
+        self.since = np.zeros(shape)                    # start of that violation
+        self.onset = np.zeros(shape)                    # when the alarm annunciated
+        self.shown = np.zeros(shape, dtype=np.int8)     # active or latched kind
+        self.acked = np.zeros(shape, dtype=bool)       # of the limit alarm
+        self.technical = np.zeros(shape, dtype=bool)   # sensor-off alarm raised
+        self.tech_acked = np.zeros(shape, dtype=bool)  # of the sensor-off alarm
+        self.alarms = []
+        self.ticks = 0
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # --- Inputs (any thread) ---
+
+    def set_values(self, bed, values):
+        # {field: value}; None (no reading) and unknown fields are ignored
+        with self._lock:
+            for field, value in values.items():
+                col = self.columns.get(field)
+                if col is not None:
+                    self._values[bed, col] = np.nan if value is None else value
+
+    def set_stale(self, bed, stale):
+        with self._lock:
+            for field, flag in stale.items():
+                col = self.columns.get(field)
+                if col is not None:
+                    self._stale[bed, col] = flag
+
+    def set_grid(self, values, stale=None):
+        # Every bed's values at once, (beds, params) in self.fields order,
+        # NaN for no reading; for station-wide feeds
+        with self._lock:
+            self._values[:] = values
+            if stale is not None:
+                self._stale[:] = stale
+
+    def acknowledge(self, bed=None):
+        # Silence what is annunciated now (one bed or all) until its
+        # condition clears; latched alarms whose condition has cleared go
+        # away
+        with self._lock:
+            self._acks.append(bed)
+        self._wake.set()
+
+    # --- Engine thread ---
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alarms", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def close(self):
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.tick()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            values = self._values.copy()
+            stale = self._stale.copy()
+            acks, self._acks = self._acks, []
+
+        # Stale readings are not judged against limits
+        values[stale] = np.nan
+        hi = np.where(self.kind == ABOVE, self.high - self.hysteresis, self.high)
+        lo = np.where(self.kind == BELOW, self.low + self.hysteresis, self.low)
+        violation = np.where(values > hi, ABOVE, np.where(values < lo, BELOW, 0)).astype(np.int8)
+
+        # Time each violation from its start; a new kind restarts the clock
+        restart = (violation != 0) & (violation != self.pending)
+        self.since[restart] = now
+        self.pending = violation
+        due = (violation != 0) & (now - self.since >= self.delay)
+        kind = np.where(due | (violation == self.kind), violation, 0).astype(np.int8)
+
+        # A new violation is a new episode: any acknowledgment is void
+        episode = (kind != 0) & (kind != self.kind)
+        self.acked[episode] = False
+        # Latched alarms stay up after the condition clears unless they were
+        # acknowledged while active
+        latched = self.latching & ~self.acked
+        shown = np.where(kind != 0, kind, np.where(latched, self.shown, 0)).astype(np.int8)
+        technical = stale & self.has_sensor
+        self.tech_acked &= technical & self.technical
+        self.technical = technical
+        raised = episode | (shown != 0) & (self.shown == 0)
+        self.onset[raised] = now
+        self.kind = kind
+
+        for bed in acks:
+            rows = slice(None) if bed is None else bed
+            # Latched alarms whose condition has cleared are dismissed
+            shown[rows] = np.where(kind[rows] != 0, shown[rows], 0)
+            self.acked[rows] |= shown[rows] != 0
+            self.tech_acked[rows] |= technical[rows]
+        self.shown = shown
+        self.acked &= shown != 0
+
+        escalated = (shown != 0) & ~self.acked & (now - self.onset >= self.ESCALATE_AFTER)
+        priority = np.minimum(self.priority + escalated, HIGH)
+        self.ticks += 1
+        self._publish(shown, technical, priority)
+
+    def _publish(self, shown, technical, priority):
+        alarms = []
+        for bed, col in zip(*np.nonzero(shown)):
+            field = self.fields[col]
+            alarms.append((self.onset[bed, col], Alarm(
+                int(bed), field, int(shown[bed, col]), int(priority[bed, col]),
+                bool(self.acked[bed, col]), bool(self.kind[bed, col] == 0), self.limits[field])))
+        for bed, col in zip(*np.nonzero(technical)):
+            field = self.fields[col]
+            alarms.append((0.0, Alarm(int(bed), field, TECHNICAL, int(self.technical_priority[col]),
+                                      bool(self.tech_acked[bed, col]), False, self.limits[field])))
+        # Most urgent first: unacknowledged, higher priority, older
+        alarms.sort(key=lambda item: (item[1].acked, -item[1].priority, item[0]))
+        alarms = [alarm for _onset, alarm in alarms]
+        if [a.key for a in alarms] != [a.key for a in self.alarms]:
+            self.alarms = alarms
+            self.changed.emit(alarms)
+
+# --- BENCHMARK ---
+
+def benchmark(beds=64, params=32, ticks=2000):
+    # Cost of one evaluation pass over a large central station
+    limits = {f"P{i}": AlarmLimit(40, 160, hysteresis=2, delay=5, latching=i % 2 == 0, sensor=f"S{i}")
+              for i in range(params)}
+    engine = AlarmEngine(beds, limits)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for i in range(ticks):
+        engine.set_grid(rng.normal(100, 35, (beds, params)), rng.random((beds, params)) < 0.01)
+        engine.tick(now=i * 0.25)
+    elapsed = time.perf_counter() - start
+    print(f"{beds} beds x {params} params: {elapsed / ticks * 1e6:.0f} us per tick, "
+          f"{len(engine.alarms)} alarms annunciated at the end")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,106 @@
+import atexit
+import json
+import threading
+import time
+from collections import deque
+
+# --- AUDIT LOG ---
+# Gestures, device toggles and environment changes are recorded for incident
+# review. log() is called on the GUI thread (sometimes on every camera
+# frame), so it only appends to an in-memory deque (atomic, no lock). A
+# background thread writes the buffer to the audit_log table in batches,
+# either when batch_size events are waiting or every flush_interval seconds.
+# Whatever is still buffered is written on close(), which also runs at exit.
+# Events lost to a full buffer are counted and recorded as an audit row of
+# their own ("audit", "dropped") with the next batch that gets written.
+
+class AuditLog:
+    def __init__(self, db, flush_interval=1.0, batch_size=200, max_buffer=100000):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # Bounded so a stuck disk can't eat memory; oldest events go first
+        self._buffer = deque(maxlen=max_buffer)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.logged = 0
+        self.written = 0
+        self.batches = 0
+        self.overflowed = 0      # events log() pushed out of a full buffer
+        self.requeue_dropped = 0 # events of a failed batch that no longer fit
+        self._reported = 0       # drops already written as an audit row
+
+        self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def dropped(self):
+        # Events lost to a full buffer before they could be written
+        return self.overflowed + self.requeue_dropped
+
+    def log(self, category, action, **detail):
+        if self._closed:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.overflowed += 1 # the append pushes out the oldest event
+        self._buffer.append((time.time(), category, action, detail))
+        self.logged += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    # --- Flusher ---
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        # Safe from any thread; writes happen one batch at a time
+        with self._write_lock:
+            while self._buffer:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._buffer.popleft())
+                except IndexError:
+                    pass
+                rows = [(ts, category, action, json.dumps(detail, default=str) if detail else None)
+                        for ts, category, action, detail in batch]
+                lost = self.dropped - self._reported
+                if lost:
+                    rows.append((time.time(), "audit", "dropped", json.dumps({"events": lost})))
+                try:
+                    with self.db.transaction(invalidates=()) as c:
+                        c.executemany('INSERT INTO audit_log (ts, category, action, detail) VALUES (?, ?, ?, ?)', rows)
+                except Exception as e:
+                    # Put the batch back (in order) and retry on the next
+                    # tick. Events logged meanwhile may have filled the
+                    # buffer: what no longer fits is dropped, oldest first,
+                    # rather than letting extendleft push out the newest.
+                    free = self._buffer.maxlen - len(self._buffer)
+                    keep = batch[max(0, len(batch) - free):]
+                    if len(keep) < len(batch):
+                        self.requeue_dropped += len(batch) - len(keep)
+                        print(f"Warning: audit buffer full, dropped {len(batch) - len(keep)} events")
+                    self._buffer.extendleft(reversed(keep))
+                    print(f"Warning: audit flush failed: {e}")
+                    return False
+                self.written += len(batch)
+                self._reported += lost
+                self.batches += 1
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        self.flush()
+        atexit.unregister(self.close)
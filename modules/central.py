@@ -0,0 +1,119 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel
+from PyQt6.QtCore import Qt, QObject, QTimer
+import numpy as np
+
+from modules.monitor import ModernCard, MultiLeadECG
+from modules.waveform import EcgBank, SampleScheduler, WaveformSource
+
+# --- CENTRAL STATION ---
+# N compact bed tiles on one screen. Instead of N monitors each running their
+# own timers and generator, one StationDriver owns the only sample timer and
+# the only render timer: every tick it asks the shared EcgBank for all beds'
+# samples in one vectorized pass and hands each tile its slice; every frame
+# it lets each tile paint its new sweep strip, so all repaints land in the
+# same event-loop pass and reach the screen in one backing-store flush.
+
+class BedFeed(WaveformSource):
+    # One bed's slice of the bank. Samples are pushed by the StationDriver,
+    # so this mostly describes the stream (leads, rate) to the plot; the
+    # bank's rate is shared by every bed and can't be changed per tile.
+    def __init__(self, bank, bed):
+        self.bank = bank
+        self.bed = bed
+        self.leads = bank.leads
+        self.sample_rate = bank.sample_rate
+
+    def read(self, n):
+        # Every sample of this bed was already pushed by the driver's tick,
+        # so a pull by the plot (set_source, restart) finds none pending
+        return np.empty((len(self.leads), 0), dtype=np.float32)
+
+class StationDriver(QObject):
+    def __init__(self, bank, fps=30, block_ms=20, parent=None):
+        super().__init__(parent)
+        self.bank = bank
+        self.plots = [] # one MultiLeadECG per bed, in bed order
+        self.block_ms = block_ms
+        self.fps = fps
+        self.scheduler = SampleScheduler(bank.sample_rate, block_ms)
+        self.sample_timer = QTimer(self)
+        self.sample_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.sample_timer.timeout.connect(self.tick)
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self.render)
+
+    def attach(self, plot):
+        self.plots.append(plot)
+
+    def start(self):
+        # Resume live rather than catching up on time spent hidden
+        self.scheduler.reset()
+        self.sample_timer.start(self.block_ms)
+        self.render_timer.start(max(1, int(round(1000 / self.fps))))
+
+    def stop(self):
+        self.sample_timer.stop()
+        self.render_timer.stop()
+
+    def tick(self):
+        due = self.scheduler.due()
+        if due <= 0:
+            return
+        first = self.scheduler.produced - due
+        block = self.bank.generate(due) # (beds, leads, due)
+        for bed, plot in enumerate(self.plots):
+            plot.push_block(first, block[bed])
+
+    def render(self):
+        for plot in self.plots:
+            plot.render_frame()
+
+class BedTile(ModernCard):
+    def __init__(self, name, feed, driver, window_seconds=4.0):
+        super().__init__(bg_color="#181818")
+        self.setMinimumSize(260, 140)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 6, 10, 6)
+        layout.setSpacing(0)
+
+        head = QHBoxLayout()
+        head.addWidget(QLabel(name, styleSheet="color:#DDD; font-size:14px; font-weight:bold; border:none;"))
+        head.addStretch()
+        self.hr_label = QLabel(f"{feed.bank.heart_rates[feed.bed]:.0f}",
+                               styleSheet="color:#00E676; font-size:28px; font-weight:bold; border:none;")
+        head.addWidget(self.hr_label)
+        head.addWidget(QLabel("bpm", styleSheet="color:#AAA; margin-top:10px; border:none;"))
+        layout.addLayout(head)
+
+        self.ecg_plot = MultiLeadECG(fps=driver.fps, window_seconds=window_seconds, mode="sweep",
+                                     source=feed, driven=True)
+        layout.addWidget(self.ecg_plot, 1)
+        driver.attach(self.ecg_plot)
+
+class CentralStation(QWidget):
+    def __init__(self, beds=8, columns=4, sample_rate=250, fps=30, seed=None):
+        super().__init__()
+        self.setStyleSheet("background-color: #121212;")
+        # Simulated census: one lead II per bed, resting rates 55-110 bpm
+        rng = np.random.default_rng(seed)
+        self.bank = EcgBank(beds, leads=["II"], heart_rates=rng.integers(55, 111, beds),
+                            sample_rate=sample_rate, seed=seed)
+        self.driver = StationDriver(self.bank, fps=fps, parent=self)
+
+        grid = QGridLayout(self)
+        grid.setContentsMargins(15, 15, 15, 15)
+        grid.setSpacing(10)
+        self.tiles = []
+        for bed in range(beds):
+            tile = BedTile(f"BED {bed + 1:02d}", BedFeed(self.bank, bed), self.driver)
+            grid.addWidget(tile, bed // columns, bed % columns)
+            self.tiles.append(tile)
+
+    # Only run the shared clock while the station is on screen
+    def showEvent(self, event):
+        self.driver.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.driver.stop()
+        super().hideEvent(event)
@@ -1,19 +1,211 @@
 
 import sqlite3
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Applied to every connection when it is opened. WAL lets readers run while a
+# writer commits, and synchronous=NORMAL only fsyncs at checkpoints.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # ~16 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Schema migrations, applied in order. Each name is a DatabaseManager method
+# taking a cursor; the version is recorded in schema_version once it commits.
+MIGRATIONS = [
+    (1, "migrate_base_schema"),
+    (2, "migrate_query_indexes"),
+    (3, "migrate_schedule_sort_indexes"),
+    (4, "migrate_patient_search"),
+    (5, "migrate_audit_log"),
+    (6, "migrate_null_safe_sort_indexes"),
+]
+
+# Sortable schedule columns (view column -> SQL expression). Only these are
+# ever interpolated into the paging query. Nullable columns sort as '' so
+# the keyset comparison never meets a NULL (which would end paging early).
+SCHEDULE_SORT_COLUMNS = {
+    0: "COALESCE(operations.op_date, '')",
+    1: "COALESCE(operations.op_type, '')",
+    2: "patients.full_name",
+    3: "COALESCE(operations.status, '')",
+}
+
+# Database files already brought up to date in this process.
+_migrated_dbs = set()
+_migrate_lock = threading.Lock()
+
+# Read-through cache groups and the writes that make them stale
+CACHE_ALL = ("doctor", "patient", "schedule")
+
+class QueryCache:
+    # Bounded LRU with a per-entry TTL. Keys are (group, ...) tuples so a
+    # writer can drop a whole group. Shared by every thread of one manager.
+    def __init__(self, max_entries=512, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        # Bumped on invalidation; a read that started before the bump must not
+        # store what it loaded, or a stale row could outlive the write.
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        group = key[0]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            gen = self._generations.get(group, 0)
+        value = loader()
+        with self._lock:
+            if self._generations.get(group, 0) == gen:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *groups):
+        groups = groups or CACHE_ALL
+        with self._lock:
+            for group in groups:
+                self._generations[group] = self._generations.get(group, 0) + 1
+            for key in [k for k in self._entries if k[0] in groups]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
 
 class DatabaseManager:
     def __init__(self, db_name="hospital.db"):
+        if db_name == ":memory:" or str(db_name).startswith("file::memory:"):
+            # Every thread (executor pool included) opens its own connection,
+            # and each would get its own empty, unmigrated in-memory database
+            raise ValueError("DatabaseManager needs a database file; use a temporary "
+                             "file instead of ':memory:'")
         self.db_name = db_name
-        self.init_db()
+        # One long-lived connection per thread (sqlite3 objects are not
+        # shareable across threads), opened lazily on first use.
+        self._local = threading.local()
+        self._connections = []
+        self._conn_lock = threading.Lock()
+        self.cache = QueryCache()
+        self.migrate()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_name)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: reads never open an implicit transaction,
+            # writes are grouped explicitly through transaction().
+            # check_same_thread=False only so close() can reach every thread's
+            # connection at shutdown; each one is still used by its owner only.
+            conn = sqlite3.connect(self.db_name, isolation_level=None, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.tx_depth = 0
+            self._local.tx_invalidates = set()
+            with self._conn_lock:
+                self._connections.append(conn)
+        return conn
 
-    def init_db(self):
+    @contextmanager
+    def transaction(self, invalidates=CACHE_ALL):
+        # Usage: with db.transaction() as c: c.execute(...); c.execute(...)
+        # Nested blocks join the outermost transaction, so one commit covers
+        # every write made inside it. On commit the cache groups named in
+        # `invalidates` are dropped; by default that is every group, so a new
+        # writer can't leave stale reads behind by accident.
         conn = self.get_connection()
+        depth = self._local.tx_depth
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.tx_invalidates = set()
+        self._local.tx_invalidates.update(invalidates)
+        self._local.tx_depth = depth + 1
         cursor = conn.cursor()
-        
+        try:
+            yield cursor
+        except BaseException:
+            self._local.tx_depth = depth
+            if depth == 0:
+                conn.rollback()
+            raise
+        else:
+            self._local.tx_depth = depth
+            if depth == 0:
+                conn.commit()
+                if self._local.tx_invalidates:
+                    self.cache.invalidate(*self._local.tx_invalidates)
+        finally:
+            cursor.close()
+
+    def close(self):
+        with self._conn_lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def migrate(self):
+        # Runs at most once per database file per process, so building extra
+        # managers (or reopening dialogs) doesn't touch the schema again.
+        key = os.path.abspath(self.db_name)
+        with _migrate_lock:
+            if key in _migrated_dbs:
+                return
+            self.init_db()
+            _migrated_dbs.add(key)
+
+    def init_db(self):
+        conn = self.get_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        current = self.get_schema_version()
+        for version, name in MIGRATIONS:
+            if version <= current:
+                continue
+            with self.transaction() as cursor:
+                getattr(self, name)(cursor)
+                cursor.execute('INSERT INTO schema_version (version) VALUES (?)', (version,))
+
+    def get_schema_version(self):
+        c = self.get_connection().execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+        return c.fetchone()[0]
+
+    # --- MIGRATIONS ---
+
+    def migrate_base_schema(self, cursor):
+        # IF NOT EXISTS: databases created before versioning already have these
         # Patients Table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS patients (
@@ -51,15 +243,76 @@ class DatabaseManager:
             )
         ''')
 
-        conn.commit()
-        
         # Seed Data if empty
         cursor.execute('SELECT count(*) FROM doctors')
         if cursor.fetchone()[0] == 0:
             self.seed_data(cursor)
-            conn.commit()
-            
-        conn.close()
+
+    def migrate_query_indexes(self, cursor):
+        # Schedule lookup filters on doctor and orders by date
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_operations_doctor_date ON operations(doctor_id, op_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_operations_patient ON operations(patient_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_patients_full_name ON patients(full_name)')
+
+    def migrate_schedule_sort_indexes(self, cursor):
+        # Keyset pages sorted by procedure or status walk these instead of sorting
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_operations_doctor_type ON operations(doctor_id, op_type)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_operations_doctor_status ON operations(doctor_id, status)')
+
+    def migrate_patient_search(self, cursor):
+        # External-content FTS5 index over name + history; the text lives only
+        # in `patients`, triggers keep the index in step with every write.
+        # prefix='2 3' keeps short search-as-you-type prefixes cheap.
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+                full_name, medical_history,
+                content='patients', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS patients_fts_insert AFTER INSERT ON patients BEGIN
+                INSERT INTO patients_fts (rowid, full_name, medical_history)
+                VALUES (new.id, new.full_name, new.medical_history);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS patients_fts_delete AFTER DELETE ON patients BEGIN
+                INSERT INTO patients_fts (patients_fts, rowid, full_name, medical_history)
+                VALUES ('delete', old.id, old.full_name, old.medical_history);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS patients_fts_update AFTER UPDATE OF full_name, medical_history ON patients BEGIN
+                INSERT INTO patients_fts (patients_fts, rowid, full_name, medical_history)
+                VALUES ('delete', old.id, old.full_name, old.medical_history);
+                INSERT INTO patients_fts (rowid, full_name, medical_history)
+                VALUES (new.id, new.full_name, new.medical_history);
+            END
+        ''')
+        # Index patients that existed before this migration
+        cursor.execute("INSERT INTO patients_fts (patients_fts) VALUES ('rebuild')")
+
+    def migrate_audit_log(self, cursor):
+        # Written in batches by modules.audit.AuditLog; detail is JSON
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                category TEXT NOT NULL,
+                action TEXT NOT NULL,
+                detail TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_ts ON audit_log(ts)')
+
+    def migrate_null_safe_sort_indexes(self, cursor):
+        # The schedule sorts on COALESCE(col, ''); index the same expressions
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_operations_doctor_date_key ON operations(doctor_id, COALESCE(op_date, ''))")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_operations_doctor_type_key ON operations(doctor_id, COALESCE(op_type, ''))")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_operations_doctor_status_key ON operations(doctor_id, COALESCE(status, ''))")
+        cursor.execute('DROP INDEX IF EXISTS idx_operations_doctor_type')
+        cursor.execute('DROP INDEX IF EXISTS idx_operations_doctor_status')
 
     def seed_data(self, cursor):
         # Seed Doctor
@@ -108,48 +361,100 @@ class DatabaseManager:
         
         print("Database seeded successfully.")
 
+    # --- READS (cached) ---
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def invalidate_cache(self, *groups):
+        # For writes made outside transaction(); no groups = everything
+        self.cache.invalidate(*groups)
+
     def get_doctor(self):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute('SELECT * FROM doctors LIMIT 1')
-        res = c.fetchone()
-        conn.close()
-        return res
+        return self.cache.get_or_load(("doctor",), lambda: self.get_connection().execute(
+            'SELECT * FROM doctors LIMIT 1').fetchone())
 
     def get_patients(self):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute('SELECT id, full_name FROM patients')
-        res = c.fetchall()
-        conn.close()
-        return res
+        c = self.get_connection().execute('SELECT id, full_name FROM patients')
+        return c.fetchall()
+
+    def search_patients(self, query, limit=20, open_tag="<b>", close_tag="</b>"):
+        # Ranked full-text search over name and medical history.
+        # Rows: (id, full_name, highlighted name, history snippet, rank)
+        # Every word must match as a prefix, so results follow the user while
+        # typing ("penic lis" finds Penicillin + Lisinopril). Words are quoted
+        # so FTS5 operators in the input are treated as plain text.
+        words = re.findall(r"\w+", query, re.UNICODE)
+        if not words:
+            return []
+        terms = [f'"{w}"*' for w in words]
+        c = self.get_connection().execute('''
+            SELECT patients.id, patients.full_name,
+                   highlight(patients_fts, 0, ?, ?),
+                   snippet(patients_fts, 1, ?, ?, '…', 12),
+                   bm25(patients_fts, 5.0, 1.0) AS rank
+            FROM patients_fts
+            JOIN patients ON patients.id = patients_fts.rowid
+            WHERE patients_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        ''', (open_tag, close_tag, open_tag, close_tag, " ".join(terms), limit))
+        return c.fetchall()
 
     def get_patient_details(self, pat_id):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute('SELECT * FROM patients WHERE id = ?', (pat_id,))
-        res = c.fetchone()
-        conn.close()
-        return res
+        return self.cache.get_or_load(("patient", pat_id), lambda: self.get_connection().execute(
+            'SELECT * FROM patients WHERE id = ?', (pat_id,)).fetchone())
 
     def get_operations(self, doctor_id):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute('''
+        return self.cache.get_or_load(("schedule", doctor_id), lambda: self._load_operations(doctor_id))
+
+    def _load_operations(self, doctor_id):
+        c = self.get_connection().execute('''
             SELECT operations.op_date, operations.op_type, patients.full_name, operations.status 
             FROM operations 
             JOIN patients ON operations.patient_id = patients.id
             WHERE doctor_id = ?
         ''', (doctor_id,))
-        res = c.fetchall()
-        conn.close()
-        return res
+        return c.fetchall()
 
-    def add_patient(self, name, age, history):
-         conn = self.get_connection()
-         c = conn.cursor()
-         c.execute('INSERT INTO patients (full_name, age, gender, medical_history, status) VALUES (?, ?, ?, ?, ?)',
-                   (name, age, "Unknown", history, "Pending Assessment"))
-         conn.commit()
-         conn.close()
+    def get_operations_page(self, doctor_id, sort_column=0, descending=False,
+                            after=None, limit=100, filter_text=""):
+        key = ("schedule", doctor_id, sort_column, descending, after, limit, filter_text)
+        return self.cache.get_or_load(key, lambda: self._load_operations_page(
+            doctor_id, sort_column, descending, after, limit, filter_text))
+
+    def _load_operations_page(self, doctor_id, sort_column, descending, after, limit, filter_text):
+        # Keyset pagination: `after` is the (sort value, operation id) of the
+        # last row already loaded, so every page is an index range scan no
+        # matter how deep into the history the user has scrolled.
+        # Rows: (op_id, op_date, op_type, patient name, status)
+        sort_expr = SCHEDULE_SORT_COLUMNS[sort_column]
+        direction = "DESC" if descending else "ASC"
+        where = ["operations.doctor_id = ?"]
+        params = [doctor_id]
+        if filter_text:
+            like = f"%{filter_text}%"
+            where.append("(operations.op_type LIKE ? OR patients.full_name LIKE ? OR operations.status LIKE ?)")
+            params += [like, like, like]
+        if after is not None:
+            # The last row's raw value may be NULL; compare it as the sort key
+            where.append(f"({sort_expr}, operations.id) {'<' if descending else '>'} (COALESCE(?, ''), ?)")
+            params += list(after)
+        params.append(limit)
+        c = self.get_connection().execute(f'''
+            SELECT operations.id, operations.op_date, operations.op_type, patients.full_name, operations.status
+            FROM operations
+            JOIN patients ON operations.patient_id = patients.id
+            WHERE {" AND ".join(where)}
+            ORDER BY {sort_expr} {direction}, operations.id {direction}
+            LIMIT ?
+        ''', params)
+        return c.fetchall()
+
+    # --- WRITES ---
 
+    def add_patient(self, name, age, history):
+        with self.transaction(invalidates=("patient", "schedule")) as c:
+            c.execute('INSERT INTO patients (full_name, age, gender, medical_history, status) VALUES (?, ?, ?, ?, ?)',
+                      (name, age, "Unknown", history, "Pending Assessment"))
+            return c.lastrowid
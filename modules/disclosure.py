@@ -0,0 +1,331 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from modules.waveform import WaveformSource, UNITS_PER_MV
+
+# --- FULL DISCLOSURE ---
+# Every ECG lead of a case, stored continuously for later review:
+#
+#   disclosure/<case_id>/header.json   leads, sample rate, gain, chunk length
+#   disclosure/<case_id>/chunks.bin    compressed chunks, back to back
+#   disclosure/<case_id>/index.bin     one fixed-size INDEX_DTYPE record per chunk
+#
+# A chunk is chunk_seconds of int16 samples (gain ADC units per mV), first-
+# differenced per lead (ECG is smooth, so deltas are small) and deflated at
+# zlib level 1. The index maps wall-clock start time to file offset, so
+# review can seek anywhere in a long case by binary search and decompress
+# only the chunks it shows. A new chunk also starts at any gap in the
+# signal clock, so gaps stay gaps instead of shifting later samples.
+#
+# A case directory holds one lead set at one sample rate. When either
+# changes mid-case, recording continues in a new segment, <case_id>.1,
+# <case_id>.2, ... (open_segment picks the first one whose format matches
+# or that doesn't exist yet).
+#
+# The monitor only puts (time, block) on a queue. A writer thread encodes,
+# compresses and appends; the chunk is written before its index record, so
+# a reader never sees an index entry for data that isn't on disk yet.
+
+DISCLOSURE_DIR = "disclosure"
+INDEX_DTYPE = np.dtype([("t0", "<f8"), ("offset", "<i8"), ("nbytes", "<i4"), ("samples", "<i4")])
+DEFAULT_GAIN = 200.0 # ADC units per mV
+
+def encode_chunk(adc):
+    # adc: (leads, n) int16 -> bytes. Differences wrap in int16 and the
+    # running sum on decode wraps back, so the round trip is exact.
+    delta = np.diff(adc, axis=1, prepend=np.zeros((adc.shape[0], 1), dtype=np.int16))
+    return zlib.compress(delta.astype("<i2").tobytes(), 1)
+
+def decode_chunk(data, leads, samples):
+    delta = np.frombuffer(zlib.decompress(data), dtype="<i2").reshape(leads, samples)
+    return np.cumsum(delta, axis=1, dtype=np.int16)
+
+class DisclosureWriter:
+    def __init__(self, case_id, leads, sample_rate, directory=DISCLOSURE_DIR,
+                 chunk_seconds=10.0, gain=DEFAULT_GAIN):
+        self.case_id = str(case_id)
+        self.base_case_id = self.case_id # set by open_segment for later segments
+        self.directory = directory
+        self.chunk_seconds = chunk_seconds
+        self.path = os.path.join(directory, str(case_id))
+        os.makedirs(self.path, exist_ok=True)
+        self.leads = list(leads)
+        self.sample_rate = float(sample_rate)
+        self.gain = gain
+        self.chunk_samples = max(1, int(chunk_seconds * self.sample_rate))
+        self.scale = gain / UNITS_PER_MV
+
+        header_path = os.path.join(self.path, "header.json")
+        header = {"leads": self.leads, "sample_rate": self.sample_rate,
+                  "gain": gain, "chunk_samples": self.chunk_samples}
+        if os.path.exists(header_path):
+            # Reopening a case appends to it, but only in the same format
+            with open(header_path, encoding="utf-8") as f:
+                old = json.load(f)
+            if {k: old.get(k) for k in header} != header:
+                raise ValueError(f"{self.path} was recorded as {old}, not {header}")
+        else:
+            with open(header_path, "w", encoding="utf-8") as f:
+                json.dump(header, f)
+
+        self._chunks = open(os.path.join(self.path, "chunks.bin"), "ab")
+        self._index = open(os.path.join(self.path, "index.bin"), "ab")
+        # Pending chunk being filled by the writer thread
+        self._buf = np.empty((len(self.leads), self.chunk_samples), dtype=np.int16)
+        self._fill = 0
+        self._t0 = None
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self.samples_written = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"disclosure-{case_id}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- Producer side (GUI thread, never blocks) ---
+
+    def write(self, t0, block):
+        # block: (leads, n) display-unit samples; t0: wall time of block[:, 0]
+        if not self._closed and block.shape[1]:
+            self._queue.put((t0, block))
+
+    def request_flush(self):
+        # Ask the writer to write out the partial chunk; the returned event
+        # is set once everything recorded so far is on disk
+        done = threading.Event()
+        if self._closed:
+            done.set() # close() wrote it already
+        else:
+            self._queue.put(done)
+        return done
+
+    def flush(self, timeout=5.0):
+        # request_flush() and wait for it
+        return self.request_flush().wait(timeout)
+
+    def next_segment(self, leads, sample_rate):
+        # Close this segment and carry on recording the case with a new
+        # lead set or sample rate; returns the writer to use from now on
+        self.close()
+        writer = open_segment(self.base_case_id, leads, sample_rate, self.directory,
+                              self.chunk_seconds, self.gain)
+        print(f"Full disclosure: {self.case_id} continues as {writer.case_id} "
+              f"({len(writer.leads)} leads at {writer.sample_rate:g} Hz)")
+        return writer
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        atexit.unregister(self.close)
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if isinstance(item, threading.Event):
+                self._write_chunk()
+                item.set()
+                continue
+            self._append(*item)
+        self._write_chunk()
+        self._chunks.close()
+        self._index.close()
+
+    def _append(self, t0, block):
+        adc = np.clip(np.rint(block * self.scale), -32768, 32767).astype(np.int16)
+        if self._fill and abs(t0 - self._expected_t()) > 1.5 / self.sample_rate:
+            self._write_chunk() # gap (or restart) in the signal clock
+        pos = 0
+        n = adc.shape[1]
+        while pos < n:
+            if self._fill == 0:
+                self._t0 = t0 + pos / self.sample_rate
+            take = min(n - pos, self.chunk_samples - self._fill)
+            self._buf[:, self._fill:self._fill + take] = adc[:, pos:pos + take]
+            self._fill += take
+            pos += take
+            if self._fill == self.chunk_samples:
+                self._write_chunk()
+
+    def _expected_t(self):
+        return self._t0 + self._fill / self.sample_rate
+
+    def _write_chunk(self):
+        if not self._fill:
+            return
+        data = encode_chunk(self._buf[:, :self._fill])
+        offset = self._chunks.tell()
+        self._chunks.write(data)
+        self._chunks.flush()
+        rec = np.array([(self._t0, offset, len(data), self._fill)], dtype=INDEX_DTYPE)
+        self._index.write(rec.tobytes())
+        self._index.flush()
+        self.chunks_written += 1
+        self.bytes_written += len(data)
+        self.samples_written += self._fill
+        self._fill = 0
+
+def open_segment(case_id, leads, sample_rate, directory=DISCLOSURE_DIR,
+                 chunk_seconds=10.0, gain=DEFAULT_GAIN):
+    # Writer for the first segment of the case recorded in this format (or
+    # a new one): <case_id>, then <case_id>.1, <case_id>.2, ...
+    segment = 0
+    while True:
+        name = str(case_id) if segment == 0 else f"{case_id}.{segment}"
+        try:
+            writer = DisclosureWriter(name, leads, sample_rate, directory, chunk_seconds, gain)
+        except ValueError:
+            segment += 1
+            continue
+        writer.base_case_id = str(case_id)
+        return writer
+
+class DisclosureReader:
+    # Random access into a case, also while it is still being recorded
+    # (call refresh() to see chunks written since opening).
+    CACHE_CHUNKS = 8
+
+    def __init__(self, case_id, directory=DISCLOSURE_DIR):
+        self.path = os.path.join(directory, str(case_id))
+        with open(os.path.join(self.path, "header.json"), encoding="utf-8") as f:
+            header = json.load(f)
+        self.leads = header["leads"]
+        self.sample_rate = float(header["sample_rate"])
+        self.scale = np.float32(UNITS_PER_MV / header["gain"])
+        self._chunks = open(os.path.join(self.path, "chunks.bin"), "rb")
+        self._cache = {} # chunk number -> decoded int16, insertion = LRU order
+        self.refresh()
+
+    def refresh(self):
+        index_path = os.path.join(self.path, "index.bin")
+        # Ignore a record that is still being written
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        self.index = np.fromfile(index_path, dtype=INDEX_DTYPE, count=count)
+        self._ends = self.index["t0"] + self.index["samples"] / self.sample_rate
+
+    @property
+    def start_time(self):
+        return float(self.index["t0"][0]) if len(self.index) else None
+
+    @property
+    def end_time(self):
+        return float(self._ends[-1]) if len(self.index) else None
+
+    def close(self):
+        self._chunks.close()
+
+    def chunk(self, i):
+        adc = self._cache.pop(i, None)
+        if adc is None:
+            rec = self.index[i]
+            self._chunks.seek(int(rec["offset"]))
+            adc = decode_chunk(self._chunks.read(int(rec["nbytes"])), len(self.leads), int(rec["samples"]))
+            if len(self._cache) >= self.CACHE_CHUNKS:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[i] = adc
+        return adc
+
+    def read(self, t, seconds):
+        # (leads, n) display-unit samples for [t, t + seconds); NaN where
+        # nothing was recorded. Only chunks overlapping the span are read.
+        n = int(round(seconds * self.sample_rate))
+        out = np.full((len(self.leads), n), np.nan, dtype=np.float32)
+        if n == 0 or not len(self.index):
+            return out
+        t_end = t + n / self.sample_rate
+        first = max(0, int(np.searchsorted(self._ends, t, side="right")))
+        last = int(np.searchsorted(self.index["t0"], t_end, side="left"))
+        for i in range(first, last):
+            rec = self.index[i]
+            # Sample offsets of this chunk relative to t, on t's sample grid
+            lag = int(round((rec["t0"] - t) * self.sample_rate))
+            lo = max(0, -lag)
+            hi = min(int(rec["samples"]), n - lag)
+            if hi > lo:
+                out[:, lag + lo:lag + hi] = self.chunk(i)[:, lo:hi]
+        out *= self.scale
+        return out
+
+class DisclosureSource(WaveformSource):
+    # Plays a recorded case through MultiLeadECG from any point in time
+    live = False
+
+    def __init__(self, reader, start=None, speed=1.0):
+        self.reader = reader
+        self.leads = reader.leads
+        self.sample_rate = reader.sample_rate
+        self.speed = float(speed)
+        self.time = reader.start_time if start is None else start
+
+    def seek(self, t):
+        self.time = t
+
+    def read(self, n):
+        if self.time is None:
+            self.reader.refresh()
+            self.time = self.reader.start_time
+            if self.time is None:
+                return np.empty((len(self.leads), 0), dtype=np.float32)
+        end = self.time + n / self.sample_rate
+        if self.reader.end_time is None or end > self.reader.end_time:
+            self.reader.refresh() # the case may still be recording
+            if self.reader.end_time is None:
+                return np.empty((len(self.leads), 0), dtype=np.float32)
+            end = min(end, self.reader.end_time)
+        n = max(0, int(round((end - self.time) * self.sample_rate)))
+        block = self.reader.read(self.time, n / self.sample_rate)
+        self.time += n / self.sample_rate
+        # Unrecorded gaps draw as baseline
+        np.nan_to_num(block, copy=False)
+        return block
+
+# --- BENCHMARK ---
+
+def benchmark(seconds=3600, sample_rate=500, chunk_seconds=10.0):
+    # Writer cost per display block and the review seek cost, on a temp case
+    import tempfile
+    from modules.waveform import SimulatedSource, LIMB_LEADS
+    source = SimulatedSource(LIMB_LEADS, sample_rate=sample_rate, seed=0)
+    block = int(sample_rate * 0.02)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = DisclosureWriter("bench", source.leads, sample_rate, tmp, chunk_seconds)
+        blocks = [source.read(block) for _ in range(int(seconds * sample_rate / block))]
+        start = time.perf_counter()
+        t0 = 1_700_000_000.0
+        for i, blk in enumerate(blocks):
+            writer.write(t0 + i * block / sample_rate, blk)
+        put = time.perf_counter() - start
+        writer.close()
+        total = time.perf_counter() - start
+        raw = writer.samples_written * len(source.leads) * 2
+        print(f"{seconds / 3600:g} h x {len(source.leads)} leads @ {sample_rate} Hz: "
+              f"write() {put / len(blocks) * 1e6:.1f} us per block on the caller, "
+              f"{total:.2f}s writer total, {writer.bytes_written / 1e6:.1f} MB "
+              f"({raw / writer.bytes_written:.1f}x smaller than raw int16)")
+
+        reader = DisclosureReader("bench", tmp)
+        rng = np.random.default_rng(0)
+        starts = t0 + rng.uniform(0, seconds - 10, 200)
+        start = time.perf_counter()
+        for t in starts:
+            reader.read(t, 10.0)
+        print(f"random 10 s review window: {(time.perf_counter() - start) / len(starts) * 1000:.2f} ms")
+        reader.close()
+
+if __name__ == "__main__":
+    benchmark()
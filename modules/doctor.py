@@ -1,19 +1,21 @@
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, 
-    QTableWidget, QTableWidgetItem, QHeaderView, QPushButton,
+    QTableView, QHeaderView, QPushButton,
     QDialog, QFormLayout, QLineEdit, QSplitter, QMessageBox
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QTimer
 from modules.database import DatabaseManager
+from modules.executor import QueryExecutor
+from modules.schedule import ScheduleModel
 from modules.timeline import TimelineWidget
 
 class AddPatientDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, executor, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Add New Patient / Operation")
         self.resize(400, 300)
-        self.db = DatabaseManager()
+        self.executor = executor
         self.init_ui()
         
     def init_ui(self):
@@ -30,9 +32,9 @@ class AddPatientDialog(QDialog):
         
         layout.addLayout(form)
         
-        save_btn = QPushButton("Save & Add to Queue")
-        save_btn.clicked.connect(self.save)
-        layout.addWidget(save_btn)
+        self.save_btn = QPushButton("Save & Add to Queue")
+        self.save_btn.clicked.connect(self.save)
+        layout.addWidget(self.save_btn)
 
     def save(self):
         name = self.name_input.text()
@@ -45,19 +47,29 @@ class AddPatientDialog(QDialog):
             return # Do not quit, stay in dialog
 
         if name:
-            self.db.add_patient(name, age_val, self.history_input.text())
+            # Insert runs on the query pool; dialog closes once it has committed
+            self.save_btn.setEnabled(False)
+            self.executor.call("add_patient", name, age_val, self.history_input.text(),
+                               on_result=lambda _id: self.accept(),
+                               on_error=self.on_save_error)
             # V5 Request: "I wanna save and rest in the page" -> Don't close?
             # User said: "I don't wanna he quit, I wanna save and rest in the page"
             # Ambiguous: Does he mean the Dialog stays open or the App doesn't crash?
             # "The program quit" refers to the crash. 
             # "Reset in the page" likely means stay on the doctor page.
             # I will close the dialog as standard behavior for "Save", assuming "quit" meant the crash.
-            self.accept()
+
+    def on_save_error(self, err):
+        self.save_btn.setEnabled(True)
+        QMessageBox.warning(self, "Database Error", f"Could not save patient: {err}")
 
 class DoctorWidget(QWidget):
-    def __init__(self):
+    def __init__(self, executor=None):
         super().__init__()
-        self.db = DatabaseManager()
+        # Shared executor (and DatabaseManager) from MainWindow
+        self.executor = executor if executor is not None else QueryExecutor(DatabaseManager(), parent=self)
+        self.db = self.executor.db
+        self._load_generation = 0
         self.init_ui()
         self.load_data()
 
@@ -91,6 +103,16 @@ class DoctorWidget(QWidget):
         dash_header = QHBoxLayout()
         dash_header.addWidget(QLabel("Surgical Schedule"))
         
+        # Filter is applied in SQL; debounce so typing doesn't re-query per key
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter procedure / patient / status...")
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(lambda: self.model.set_filter(self.filter_input.text()))
+        self.filter_input.textChanged.connect(lambda _t: self.filter_timer.start())
+        dash_header.addWidget(self.filter_input)
+        
         add_btn = QPushButton("+ Add Patient")
         add_btn.setFixedWidth(150)
         add_btn.clicked.connect(self.open_add_dialog)
@@ -98,16 +120,18 @@ class DoctorWidget(QWidget):
         
         layout.addLayout(dash_header)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Date", "Procedure", "Patient", "Status"])
+        # Table (rows paged in from SQLite as the user scrolls)
+        self.model = ScheduleModel(self.executor, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
         self.table.verticalHeader().setVisible(False)
         self.table.setAlternatingRowColors(True)
         # V5: Blue background for table, Dark text
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #E3F2FD;
                 color: #000000;
                 gridline-color: #90CAF9;
@@ -136,25 +160,25 @@ class DoctorWidget(QWidget):
         main_layout.addWidget(left_widget)
 
     def load_data(self):
-        doc = self.db.get_doctor()
+        # Queries run off the GUI thread; only the newest request is applied
+        self._load_generation += 1
+        gen = self._load_generation
+        self.executor.call("get_doctor", on_result=lambda doc: self.apply_data(gen, doc))
+
+    def apply_data(self, gen, doc):
+        if gen != self._load_generation:
+            return
         if doc:
             self.doc_name.setText(f"Dr. {doc[1]}")
             self.doc_info.setText(f"{doc[2]}")
             
-            ops = self.db.get_operations(doc[0])
-            self.table.setRowCount(len(ops))
-            
-            for row, op in enumerate(ops):
-                self.table.setItem(row, 0, QTableWidgetItem(op[0]))
-                self.table.setItem(row, 1, QTableWidgetItem(op[1]))
-                self.table.setItem(row, 2, QTableWidgetItem(op[2]))
-                status = QTableWidgetItem(op[3])
-                if op[3] == "Pending": status.setForeground(QColor("red"))
-                self.table.setItem(row, 3, status)
+            # Schedule rows are paged in by the model
+            if doc[0] == self.model.doctor_id:
+                self.model.refresh()
+            else:
+                self.model.set_doctor(doc[0])
 
     def open_add_dialog(self):
-        dialog = AddPatientDialog(self)
+        dialog = AddPatientDialog(self.executor, self)
         if dialog.exec():
             self.load_data()
-
-from PyQt6.QtGui import QColor
@@ -0,0 +1,77 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import traceback
+
+# --- ASYNC QUERY LAYER ---
+# Database calls run on a small private thread pool. Results come back
+# through Qt signals, which are queued onto the GUI thread, so the ECG timer
+# and the camera loop never wait on SQLite.
+
+class QuerySignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    finished = pyqtSignal()
+
+class QueryTask(QRunnable):
+    def __init__(self, db, fn, args, kwargs):
+        super().__init__()
+        self.db = db
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # Created on the submitting (GUI) thread so its slots run there
+        self.signals = QuerySignals()
+        self.cancelled = False
+
+    def cancel(self):
+        # Result is dropped if it hasn't been delivered yet
+        self.cancelled = True
+
+    def run(self):
+        try:
+            res = self.fn(self.db, *self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            if not self.cancelled:
+                self.signals.error.emit(e)
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(res)
+        self.signals.finished.emit()
+
+class QueryExecutor(QObject):
+    def __init__(self, db, max_threads=2, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        # Workers keep their thread (and its SQLite connection) alive
+        self.pool.setExpiryTimeout(-1)
+        self._pending = set()
+
+    def submit(self, fn, *args, on_result=None, on_error=None, **kwargs):
+        # fn(db, *args, **kwargs) runs on a pool thread. on_result / on_error
+        # are called on the GUI thread with the return value / exception.
+        task = QueryTask(self.db, fn, args, kwargs)
+        task.setAutoDelete(False)
+        if on_result:
+            task.signals.result.connect(on_result)
+        if on_error:
+            task.signals.error.connect(on_error)
+        # Hold a reference until the task reports back
+        self._pending.add(task)
+        task.signals.finished.connect(lambda t=task: self._pending.discard(t))
+        self.pool.start(task)
+        return task
+
+    def call(self, method_name, *args, on_result=None, on_error=None):
+        # Shortcut for a single DatabaseManager method, e.g.
+        # executor.call("get_operations", doc_id, on_result=self.fill)
+        return self.submit(lambda db, *a: getattr(db, method_name)(*a), *args,
+                           on_result=on_result, on_error=on_error)
+
+    def shutdown(self, timeout_ms=3000):
+        for task in list(self._pending):
+            task.cancel()
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+        self._pending.clear()
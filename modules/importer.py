@@ -0,0 +1,238 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+if __package__ in (None, ""):
+    # Allow `python modules/importer.py ...` as well as `python -m modules.importer`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.database import DatabaseManager
+
+# --- BULK IMPORT ---
+# Morning OR lists arrive as CSV or JSON-lines. Each record is either a new
+# patient (optionally with a booking), or a booking for an existing patient:
+#
+#   full_name, age, gender, medical_history, status    -> new patient
+#   op_type, op_date (YYYY-MM-DD), op_status, doctor_id -> booking (optional)
+#   patient_id                                          -> book an existing patient
+#
+# Records are streamed through a generator and written with executemany in
+# chunked transactions. Bad rows are reported and skipped; the rest of the
+# batch still goes in.
+
+DEFAULT_CHUNK_SIZE = 1000
+
+class ImportReport:
+    def __init__(self):
+        self.patients = 0
+        self.operations = 0
+        self.rows = 0
+        self.errors = [] # (line number, message)
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"{self.rows} rows ({self.patients} patients, {self.operations} operations) "
+                f"in {self.elapsed:.2f}s = {self.rows_per_sec:,.0f} rows/s, {len(self.errors)} rejected")
+
+def read_records(path):
+    # Yields (line number, dict). Format is picked from the file extension.
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Physical line, not record count: quoted fields (history)
+                # can span lines. A multi-line record reports its last line.
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, ValueError(f"invalid JSON: {e.msg}")
+
+def _text(rec, key):
+    val = rec.get(key)
+    if val is None:
+        return ""
+    return str(val).strip()
+
+def _optional_int(rec, key):
+    val = _text(rec, key)
+    if not val:
+        return None
+    try:
+        return int(val)
+    except ValueError:
+        raise ValueError(f"{key} must be an integer, got {val!r}")
+
+def validate(rec, default_doctor_id):
+    # Returns (patient row or None, booking row or None, patient_id or None).
+    # Raises ValueError with a readable message for a rejected record.
+    if isinstance(rec, Exception):
+        raise rec
+    if not isinstance(rec, dict):
+        raise ValueError("record is not an object")
+
+    patient = None
+    patient_id = _optional_int(rec, "patient_id")
+    if patient_id is None:
+        name = _text(rec, "full_name")
+        if not name:
+            raise ValueError("full_name is required when patient_id is not given")
+        age = _optional_int(rec, "age")
+        if age is not None and not 0 <= age <= 150:
+            raise ValueError(f"age out of range: {age}")
+        patient = (name, age, _text(rec, "gender") or "Unknown",
+                   _text(rec, "medical_history"), _text(rec, "status") or "Pending Assessment")
+
+    booking = None
+    op_type = _text(rec, "op_type")
+    if op_type:
+        op_date = _text(rec, "op_date")
+        try:
+            date.fromisoformat(op_date)
+        except ValueError:
+            raise ValueError(f"op_date must be YYYY-MM-DD, got {op_date!r}")
+        doctor_id = _optional_int(rec, "doctor_id") or default_doctor_id
+        if doctor_id is None:
+            raise ValueError("no doctor_id and no doctor in the database")
+        booking = (doctor_id, op_type, op_date, _text(rec, "op_status") or "Pending")
+    elif patient is None:
+        raise ValueError("patient_id given without a booking (op_type)")
+    return patient, booking, patient_id
+
+def import_records(db, records, chunk_size=DEFAULT_CHUNK_SIZE):
+    # records: iterable of (line number, dict), e.g. read_records(path)
+    report = ImportReport()
+    doc = db.get_doctor()
+    default_doctor_id = doc[0] if doc else None
+    doctor_ids = {r[0] for r in db.get_connection().execute('SELECT id FROM doctors')}
+
+    start = time.perf_counter()
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            break
+        _import_chunk(db, chunk, default_doctor_id, doctor_ids, report)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def _import_chunk(db, chunk, default_doctor_id, doctor_ids, report):
+    patients = []      # rows for executemany
+    bookings = []      # (index into patients or None, existing patient id, booking)
+    for line_no, rec in chunk:
+        try:
+            patient, booking, patient_id = validate(rec, default_doctor_id)
+            if booking and booking[0] not in doctor_ids:
+                raise ValueError(f"unknown doctor_id {booking[0]}")
+        except (ValueError, TypeError) as e:
+            report.errors.append((line_no, str(e)))
+            continue
+        new_idx = None
+        if patient:
+            new_idx = len(patients)
+            patients.append(patient)
+        if booking:
+            bookings.append((line_no, new_idx, patient_id, booking))
+
+    with db.transaction(invalidates=("patient", "schedule")) as c:
+        # Bookings for existing patients need those patients to exist
+        existing = {b[2] for b in bookings if b[2] is not None}
+        if existing:
+            marks = ",".join("?" * len(existing))
+            c.execute(f'SELECT id FROM patients WHERE id IN ({marks})', tuple(existing))
+            found = {r[0] for r in c.fetchall()}
+            for b in [b for b in bookings if b[2] is not None and b[2] not in found]:
+                report.errors.append((b[0], f"unknown patient_id {b[2]}"))
+                bookings.remove(b)
+
+        if patients:
+            # AUTOINCREMENT hands out consecutive ids while we hold the write
+            # lock, so the new ids are known without a round trip per row.
+            c.execute("SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'patients'), "
+                      "(SELECT MAX(id) FROM patients), 0)")
+            first_id = c.fetchone()[0] + 1
+            c.executemany('INSERT INTO patients (full_name, age, gender, medical_history, status) '
+                          'VALUES (?, ?, ?, ?, ?)', patients)
+            c.execute('SELECT last_insert_rowid()')
+            if c.fetchone()[0] != first_id + len(patients) - 1:
+                raise RuntimeError("patient ids were not allocated consecutively")
+            report.patients += len(patients)
+
+        if bookings:
+            ops = [(first_id + idx if idx is not None else pid, doc_id, op_type, op_date, status)
+                   for _line, idx, pid, (doc_id, op_type, op_date, status) in bookings]
+            c.executemany('INSERT INTO operations (patient_id, doctor_id, op_type, op_date, status) '
+                          'VALUES (?, ?, ?, ?, ?)', ops)
+            report.operations += len(ops)
+
+    report.rows += len(chunk)
+
+# --- BENCHMARK ---
+
+def synthetic_records(count, seed=0):
+    rnd = random.Random(seed)
+    procedures = ["Craniotomy", "Appendectomy", "Laminectomy", "CABG", "Cholecystectomy", "Hip Replacement"]
+    day0 = date(2025, 1, 1)
+    for i in range(count):
+        yield i + 1, {
+            "full_name": f"Patient {i:07d}",
+            "age": rnd.randint(1, 95),
+            "gender": rnd.choice(["Male", "Female"]),
+            "medical_history": "Allergies: none known",
+            "op_type": rnd.choice(procedures),
+            "op_date": (day0 + timedelta(days=rnd.randint(0, 365))).isoformat(),
+        }
+
+def run_benchmark(counts, chunk_size):
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, "bench.db"))
+            report = import_records(db, synthetic_records(count), chunk_size)
+            db.close()
+        print(f"{count:>9,} records: {report.summary()}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-import patients and OR bookings from CSV or JSON-lines.")
+    parser.add_argument("files", nargs="*", help=".csv or .jsonl files")
+    parser.add_argument("--db", default="hospital.db")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--benchmark", type=int, nargs="+", metavar="N",
+                        help="import N synthetic records into a throwaway database and report rows/s")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.chunk_size)
+        return 0
+    if not args.files:
+        parser.error("no input files")
+
+    db = DatabaseManager(args.db)
+    failed = False
+    for path in args.files:
+        report = import_records(db, read_records(path), args.chunk_size)
+        print(f"{path}: {report.summary()}")
+        for line_no, msg in report.errors:
+            print(f"  line {line_no}: {msg}")
+        failed = failed or bool(report.errors)
+    db.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
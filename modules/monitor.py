@@ -1,10 +1,20 @@
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, 
-    QGridLayout, QPushButton, QProgressBar, QSpacerItem, QSizePolicy
+    QGridLayout, QPushButton, QProgressBar, QSpacerItem, QSizePolicy,
+    QDialog, QSlider
 )
-from PyQt6.QtCore import Qt, QTimer, QRect, QPoint
-from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QRadialGradient, QLinearGradient, QBrush, QPolygon
+from PyQt6.QtCore import Qt, QTimer, QRect, QRectF, QEvent
+from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QRadialGradient, QLinearGradient, QBrush, QPolygon, QPolygonF, QPixmap
+import time
+import numpy as np
+from modules.alarms import AlarmEngine, LOW, MEDIUM, HIGH
+from modules.vitals import VitalsModel, SimulatedVitals
+from modules.vitals_store import VitalsStore
+from modules.disclosure import DisclosureReader, DisclosureSource, open_segment
+from modules.qrs import QrsDetector
+from modules.trends import TrendPanel
+from modules.waveform import RingBuffer, SimulatedSource, SampleScheduler, LIMB_LEADS, TWELVE_LEADS, minmax_decimate
 
 # --- UTILS ---
 
@@ -19,13 +29,39 @@ class ModernCard(QFrame):
             }}
         """)
 
+STALE_COLOR = "#555" # value of a tile whose sensor has gone quiet
+
+class ValueLabel(QLabel):
+    # Numeric readout bound to the vitals model; greys out when stale
+    def __init__(self, text, style):
+        super().__init__(text)
+        self.base_style = style
+        self.setStyleSheet(style)
+
+    def set_value(self, text):
+        if text != self.text():
+            self.setText(text)
+
+    def set_stale(self, stale):
+        self.setStyleSheet(self.base_style + (f" color: {STALE_COLOR};" if stale else ""))
+
 class RecessedLabel(QLabel):
     def __init__(self, text, suffix=""):
         super().__init__()
         self.val = text
         self.suff = suffix
+        self.stale = False
         self.setStyleSheet("background-color: transparent;")
         self.setFixedSize(100, 50)
+
+    def set_value(self, text):
+        if text != self.val:
+            self.val = text
+            self.update()
+
+    def set_stale(self, stale):
+        self.stale = stale
+        self.update()
         
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -37,7 +73,7 @@ class RecessedLabel(QLabel):
         painter.drawRoundedRect(0, 15, self.width(), 35, 5, 5)
         
         # Draw Value
-        painter.setPen(QColor("#FFF"))
+        painter.setPen(QColor(STALE_COLOR if self.stale else "#FFF"))
         font = QFont("Arial", 18, QFont.Weight.Bold)
         painter.setFont(font)
         painter.drawText(QRect(0, 15, self.width()-30, 35), Qt.AlignmentFlag.AlignCenter, self.val)
@@ -50,110 +86,335 @@ class RecessedLabel(QLabel):
 
 # --- GRAPHS ---
 
-class MultiLeadECG(QWidget):
+class TracePolygon:
+    # A QPolygonF reused across frames. Its point storage is exposed as an
+    # (n, 2) float64 NumPy view, so trace coordinates are written straight
+    # from the sample arrays without creating a QPointF per sample.
+    # Points are snapped to whole pixels: the antialiased 2px stroker is
+    # several times slower on sub-pixel coordinates.
     def __init__(self):
+        self.poly = QPolygonF()
+        self.xy = np.empty((0, 2))
+        
+    def set_points(self, xs, ys):
+        n = len(xs)
+        if n != len(self.xy):
+            self.poly.resize(n)
+            if n:
+                ptr = self.poly.data()
+                ptr.setsize(n * 16) # QPointF = 2 x double
+                self.xy = np.frombuffer(ptr, dtype=np.float64).reshape(n, 2)
+            else:
+                self.xy = np.empty((0, 2))
+        np.rint(xs, out=self.xy[:, 0])
+        np.rint(ys, out=self.xy[:, 1])
+        return self.poly
+
+class MultiLeadECG(QWidget):
+    SAMPLE_RATES = (250, 500, 1000) # accepted by set_sample_rate
+    
+    SWEEP_GAP = 12 # px erase bar ahead of the sweep head
+    
+    def __init__(self, sample_rate=250, fps=60, window_seconds=2.0, block_ms=20, mode="scroll",
+                 source=None, driven=False):
         super().__init__()
+        self.mode = mode
+        # A driven plot has no timers of its own: a shared driver (central
+        # station) pushes its samples and calls render_frame()
+        self.driven = driven
+        self.trace_layer = None
         self.setStyleSheet("background-color: transparent;")
-        self.data = [ [0]*200 for _ in range(6) ] # 6 Leads, wider buffer for high-res
-        self.phases = [0.0, 0.05, 0.1, 0.15, 0.2, 0.25] # Float phases
-        self.labels = ["I", "II", "III", "aVR", "aVL", "aVF"]
-        
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_wave)
-        self.timer.start(10) # 100 FPS for smooth QRS
+        self.window_seconds = window_seconds
+        # Where samples come from: the built-in simulated patient (beat
+        # templates built once, each tick interpolates into them) unless a
+        # recording or other WaveformSource is given
+        if source is None:
+            source = SimulatedSource(LIMB_LEADS, heart_rate=60, sample_rate=sample_rate)
+        self.source = source
+        self.labels = list(source.leads)
+        self.sample_rate = source.sample_rate
+        # All leads in one preallocated circular buffer holding the visible sweep
+        self.buffer = RingBuffer(len(self.labels), int(window_seconds * self.sample_rate))
+        
+        # Optional DisclosureWriter; gets every block as-is. It is the only
+        # store of the waveform: VitalsStore keeps the 1 Hz numerics.
+        self.disclosure = None
+        # Optional QrsDetector on one lead (enable_beat_detection)
+        self.beat_detector = None
+        self.beat_lead = None
+        
+        # Signal clock: samples are generated in blocks for however much
+        # monotonic time has passed, so the clinical sample rate doesn't
+        # depend on when (or whether) Qt fires the timer. Late ticks catch up
+        # in one block and are counted in scheduler.metrics().
+        self.scheduler = SampleScheduler(self.sample_rate * source.speed, block_ms)
+        self.wall_start = time.time()
+        self.sample_timer = QTimer(self)
+        self.sample_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.sample_timer.timeout.connect(self.update_wave)
+        if not driven:
+            self.sample_timer.start(block_ms)
+        
+        # Display clock: repaint at most `fps` times a second, and only when
+        # new samples arrived since the last frame
+        self.rendered_total = 0
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self.render_frame)
+        self.set_fps(fps)
+        
+        # Static layer cache and the fonts/pens that never change per frame
+        self.theme = {
+            "grid": QColor("#1B331B"),
+            "label": QColor("#4CAF50"),
+            "trace": QColor("#00E676"),
+            "watermark": QColor(255, 255, 255, 20),
+        }
+        self.label_font = QFont("Arial", 9, QFont.Weight.Bold)
+        self.watermark_font = QFont("Arial", 40, QFont.Weight.Bold)
+        self.trace_pen = QPen(self.theme["trace"], 2)
+        self.static_layer = None
+        # Reusable trace geometry (one per lead, one for sweep segments)
+        self.trace_polys = [TracePolygon() for _ in self.labels]
+        self.segment_poly = TracePolygon()
+
+    def set_fps(self, fps):
+        self.fps = fps
+        if not self.driven:
+            self.render_timer.start(max(1, int(round(1000 / fps))))
+
+    def set_sample_rate(self, hz):
+        if hz not in self.SAMPLE_RATES:
+            raise ValueError(f"unsupported sample rate {hz} Hz; choose one of "
+                             f"{', '.join(str(r) for r in self.SAMPLE_RATES)}")
+        if hz == self.sample_rate:
+            return
+        self.update_wave() # finish the current block at the old rate
+        self.source.set_sample_rate(hz)
+        self.roll_disclosure()
+        self.restart_stream()
+
+    def set_source(self, source):
+        # Switch between the live patient and a recording
+        self.update_wave()
+        self.source = source
+        if list(source.leads) != self.labels:
+            self.labels = list(source.leads)
+            self.trace_polys = [TracePolygon() for _ in self.labels]
+            self.static_layer = None
+        self.roll_disclosure()
+        self.restart_stream()
+
+    def roll_disclosure(self):
+        # A disclosure segment has one lead set at one sample rate; only
+        # the live patient is recorded, so a replay leaves it alone
+        d = self.disclosure
+        if d and self.source.live and (list(self.source.leads) != d.leads
+                                       or self.source.sample_rate != d.sample_rate):
+            self.disclosure = d.next_segment(self.source.leads, self.source.sample_rate)
+
+    def set_speed(self, speed):
+        # Replay speed (1x, 10x, 100x): signal seconds per wall second
+        if self.source.live:
+            raise ValueError("the live patient can only be shown in real time")
+        self.update_wave()
+        self.source.speed = float(speed)
+        self.restart_stream()
+
+    def enable_beat_detection(self, lead="II"):
+        # Falls back to the first lead if the source has no such lead
+        self.beat_lead = lead
+        self.beat_row = self.labels.index(lead) if lead in self.labels else 0
+        self.beat_detector = QrsDetector(self.sample_rate)
+
+    def restart_stream(self):
+        # Fresh buffer and signal clock after the source, rate or speed changed
+        self.sample_rate = self.source.sample_rate
+        if self.beat_detector:
+            self.enable_beat_detection(self.beat_lead)
+        self.buffer = RingBuffer(len(self.labels), int(self.window_seconds * self.sample_rate))
+        self.scheduler.set_sample_rate(self.sample_rate * self.source.speed)
+        self.wall_start = time.time()
+        self.rendered_total = 0
+        self.trace_layer = None
+        self.update()
 
     def update_wave(self):
-        import math, random, time
-        
-        # Physics: 60 BPM = 1 beat/sec
-        # dt per frame at 100fps = 0.01s
-        dt = 0.01 
-        
-        for i in range(6):
-            self.phases[i] += dt
-            if self.phases[i] > 1.0: self.phases[i] -= 1.0
-            
-            t = self.phases[i] # 0.0 to 1.0 seconds (since 60bpm)
-            
-            # Get Pure Signal
-            signal = self.get_precise_ecg(t, i)
-            
-            # Baseline Wander (Respiration ~0.25 Hz)
-            baseline = 1.5 * math.sin(2 * math.pi * 0.25 * time.time())
-            
-            # Noise (Micro-tremors)
-            noise = random.uniform(-0.5, 0.5)
-            
-            val = signal + baseline + noise
-            
-            self.data[i].pop(0)
-            self.data[i].append(val)
-            
+        due = self.scheduler.due()
+        if due <= 0:
+            return
+        self.push_block(self.scheduler.produced - due, self.source.read(due))
+
+    def push_block(self, first, block):
+        # block: (leads, n) samples; `first` is the signal-clock index of
+        # the first one
+        self.buffer.extend(block)
+        if self.beat_detector:
+            self.beat_detector.process(block[self.beat_row])
+        
+        # Only the live patient is persisted, never a replay
+        if self.disclosure and self.source.live:
+            self.disclosure.write(self.wall_start + (first + 1) / self.sample_rate, block)
+
+    def render_frame(self):
+        total = self.buffer.total_written
+        if total == self.rendered_total:
+            return
+        if self.mode == "sweep":
+            self.sweep_draw(self.rendered_total, total)
+        else:
+            self.update()
+        self.rendered_total = total
+
+    def set_mode(self, mode):
+        # "scroll": whole trace shifts left each frame (full repaint)
+        # "sweep": fixed trace, a write head moves right with an erase gap,
+        #          and only the strip it touched is repainted
+        self.mode = mode
+        self.trace_layer = None
         self.update()
 
-    def get_precise_ecg(self, t, lead_idx):
-        import math
-        
-        # --- MEDICAL PARAMETERS (Normal Sinus Rhythm) ---
-        # 1. P Wave: Atrial Depol. (0.08s - 0.10s) -> Round, small
-        # 2. PR Segment: AV Delay (Isoelectric)
-        # 3. QRS: Ventricular Depol. (0.06s - 0.10s) -> Sharp, Tall
-        # 4. ST Segment: Plateau (Isoelectric)
-        # 5. T Wave: Ventricular Repol. (Asymmetric)
-        
-        val = 0.0
-        
-        def gaussian(x, mean, amp, width):
-            return amp * math.exp(-((x - mean)**2) / (2 * width**2))
-        
-        # P Wave (0.15s peak)
-        val += gaussian(t, 0.15, 4.0, 0.02)
-        
-        # Q Wave (0.23s) - Small dip
-        val += gaussian(t, 0.23, -3.0, 0.005)
-        
-        # R Wave (0.25s) - Tall Spike
-        val += gaussian(t, 0.25, 35.0, 0.007)
+    # --- Sweep Mode ---
+    
+    # Rows share the height; the baseline sits a little below the middle of
+    # its row (R waves go further up than S waves go down). Amplitudes are
+    # scaled down once rows get shorter than ROW_HEIGHT, e.g. for 12 leads.
+    ROW_HEIGHT = 90
+    
+    def lead_base_y(self, i):
+        row_h = self.height() / len(self.labels)
+        return row_h * (i + 0.65)
+
+    def lead_base_ys(self):
+        return self.lead_base_y(np.arange(len(self.labels)))[:, None]
+
+    def y_scale(self):
+        return min(1.0, self.height() / len(self.labels) / self.ROW_HEIGHT)
+
+    def sweep_x(self, n):
+        # x position of absolute sample index n on the fixed sweep
+        cap = self.buffer.capacity
+        return (n % cap) * self.width() / cap
+
+    def draw_sweep_samples(self, painter, first, data):
+        # data: (leads, k) samples whose absolute indices start at `first`.
+        # Split where the head wraps back to the left edge.
+        cap = self.buffer.capacity
+        k = data.shape[1]
+        start = 0
+        while start < k:
+            wrap = cap - ((first + start) % cap)
+            end = min(k, start + wrap)
+            if end - start > 1:
+                xs, ys = minmax_decimate(data[:, start:end], self.width() / cap, self.sweep_x(first + start))
+                ys = self.lead_base_ys() - ys * self.y_scale()
+                for i in range(len(self.labels)):
+                    painter.drawPolyline(self.segment_poly.set_points(xs, ys[i]))
+            start = end
+
+    def erase_span(self, painter, x0, x1):
+        # Clear [x0, x1) on the trace layer, wrapping at the right edge
+        w = self.width()
+        h = self.height()
+        if x1 <= w:
+            painter.fillRect(QRectF(x0, 0, x1 - x0, h), Qt.GlobalColor.transparent)
+        else:
+            painter.fillRect(QRectF(x0, 0, w - x0, h), Qt.GlobalColor.transparent)
+            painter.fillRect(QRectF(0, 0, x1 - w, h), Qt.GlobalColor.transparent)
+
+    def new_trace_layer(self):
+        dpr = self.devicePixelRatioF()
+        pix = QPixmap(max(1, int(self.width() * dpr)), max(1, int(self.height() * dpr)))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.GlobalColor.transparent)
+        return pix
+
+    def rebuild_trace_layer(self):
+        # Full redraw of whatever the buffer holds (after resize/theme/stall)
+        self.trace_layer = self.new_trace_layer()
+        total = self.buffer.total_written
+        n = min(total, self.buffer.capacity)
+        if n > 1:
+            painter = QPainter(self.trace_layer)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(self.trace_pen)
+            self.draw_sweep_samples(painter, total - n, self.buffer.latest(n))
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+            head = self.sweep_x(total)
+            self.erase_span(painter, head + 2, head + 2 + self.SWEEP_GAP)
+            painter.end()
+
+    def sweep_draw(self, start, end):
+        new = end - start
+        if self.trace_layer is None or new >= self.buffer.capacity:
+            self.rebuild_trace_layer()
+            self.update()
+            return
+        # Include the last drawn sample so the new segment joins the old one
+        anchor = 1 if start > 0 else 0
+        data = self.buffer.latest(new + anchor)
+        x0 = self.sweep_x(start - anchor)
+        x1 = self.sweep_x(end - 1)
+        if x1 < x0:
+            x1 += self.width()
+        
+        painter = QPainter(self.trace_layer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Erase under the new segment (in case a slow frame outran the gap)
+        # and the gap ahead of the head
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+        self.erase_span(painter, x0 + 1, x1 + 2 + self.SWEEP_GAP)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        painter.setPen(self.trace_pen)
+        self.draw_sweep_samples(painter, start - anchor, data)
+        painter.end()
+        
+        # Repaint only the strip that changed
+        w = self.width()
+        left = int(x0) - 2
+        right = int(x1 + self.SWEEP_GAP) + 4
+        if right <= w:
+            self.update(QRect(left, 0, right - left, self.height()))
+        else:
+            self.update(QRect(left, 0, w - left, self.height()))
+            self.update(QRect(0, 0, right - w, self.height()))
+
+    # --- Static Layer (grid, watermark, lead labels) ---
+    
+    def set_theme(self, grid=None, label=None, trace=None, watermark=None):
+        self.theme.update({k: QColor(v) for k, v in
+                           (("grid", grid), ("label", label), ("trace", trace), ("watermark", watermark)) if v})
+        self.trace_pen = QPen(self.theme["trace"], 2)
+        self.invalidate_static()
+        
+    def invalidate_static(self):
+        self.static_layer = None
+        self.trace_layer = None
+        self.update()
         
-        # S Wave (0.27s) - Sharp dip
-        val += gaussian(t, 0.27, -8.0, 0.007)
+    def resizeEvent(self, event):
+        self.static_layer = None
+        self.trace_layer = None
+        super().resizeEvent(event)
         
-        # ST Segment is naturally flat between S (0.28) and T (0.40) due to lack of gaussians
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.StyleChange, QEvent.Type.PaletteChange, QEvent.Type.FontChange):
+            self.static_layer = None
+        super().changeEvent(event)
         
-        # T Wave (0.50s) - Asymmetric (Slower rise, steeper drop)
-        # Modeled as sum of two gaussians or skewed
-        val += gaussian(t, 0.48, 6.0, 0.06) # Main body
-        val += gaussian(t, 0.52, 3.0, 0.04) # Skew
+    def build_static_layer(self):
+        # Rendered once per size / theme and blitted every frame
+        dpr = self.devicePixelRatioF()
+        pix = QPixmap(max(1, int(self.width() * dpr)), max(1, int(self.height() * dpr)))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.GlobalColor.transparent)
         
-        # Lead Projections
-        # Standard 12-lead vectors
-        if lead_idx == 0:   # I (Lateral)
-            val *= 0.7
-        elif lead_idx == 1: # II (Inferior - Classic View)
-            val *= 1.0      # Reference
-        elif lead_idx == 2: # III (Inferior)
-            # III sees less R, more S sometimes, T can be inverted
-            val *= 0.6
-            val -= gaussian(t, 0.25, 5.0, 0.01) # Reduce R
-        elif lead_idx == 3: # aVR (Right Arm)
-            val *= -0.9     # INVERTED
-        elif lead_idx == 4: # aVL (Left Arm)
-            val *= 0.6
-            val -= gaussian(t, 0.15, 2.0, 0.02) # Smaller P
-        elif lead_idx == 5: # aVF (Foot)
-            val *= 0.8
-
-        return val
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
+        painter = QPainter(pix)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
         w = self.width()
         h = self.height()
         
         # ECG Grid (Small Squares = 1mm = 0.04s)
-        painter.setPen(QPen(QColor("#1B331B"), 1))
+        painter.setPen(QPen(self.theme["grid"], 1))
         
         # Dynamically calc refined step
         # If w = 1 sec (ideally), then 25 large squares?
@@ -163,45 +424,312 @@ class MultiLeadECG(QWidget):
         for y in range(0, h, grid_step): painter.drawLine(0, y, w, y)
         
         # Watermark
-        painter.setPen(QPen(QColor(255,255,255,20), 1))
-        painter.setFont(QFont("Arial", 40, QFont.Weight.Bold))
+        painter.setPen(QPen(self.theme["watermark"], 1))
+        painter.setFont(self.watermark_font)
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "NSR")
         
-        row_h = h / 6
+        # Lead labels
+        row_h = h / len(self.labels)
+        painter.setFont(self.label_font)
+        painter.setPen(QPen(self.theme["label"], 1))
+        for i, label in enumerate(self.labels):
+            painter.drawText(8, int(self.lead_base_y(i) - row_h/4), label)
+        painter.end()
+        return pix
+
+    def paintEvent(self, event):
+        if self.static_layer is None:
+            self.static_layer = self.build_static_layer()
         
-        for i in range(6):
-            base_y = (row_h * i) + (row_h / 2) + 15
-            
-            # Label
-            painter.setFont(QFont("Arial", 9, QFont.Weight.Bold))
-            painter.setPen(QPen(QColor("#4CAF50"), 1))
-            painter.drawText(8, int(base_y - row_h/4), self.labels[i])
-            
-            # Draw Wave
-            painter.setPen(QPen(QColor("#00E676"), 2))
-            pts = []
-            
-            # Draw all 200 points to scan across width
-            # Scale x to fit width
-            step_x = w / 200
-            for j, val in enumerate(self.data[i]):
-                x = int(j * step_x)
-                y = int(base_y - val)
-                pts.append(QPoint(x, y))
-                
-            painter.drawPolyline(pts)
+        painter = QPainter(self)
+        # Blits are clipped to the update region, so a sweep strip update
+        # only copies that strip
+        painter.drawPixmap(0, 0, self.static_layer)
+        if self.mode == "sweep":
+            if self.trace_layer is None:
+                self.rebuild_trace_layer()
+            painter.drawPixmap(0, 0, self.trace_layer)
+            return
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        data = self.buffer.view() # zero-copy, oldest -> newest
+        painter.setPen(self.trace_pen)
+        
+        # Draw the whole buffer to scan across width; past 2 samples per
+        # pixel each column is reduced to its min/max. Geometry for all
+        # leads is computed in one pass, leaving one draw call per lead.
+        xs, ys = minmax_decimate(data, self.width() / self.buffer.capacity)
+        ys = self.lead_base_ys() - ys * self.y_scale()
+        for i in range(len(self.labels)):
+            painter.drawPolyline(self.trace_polys[i].set_points(xs, ys[i]))
+
+
+
+
+# --- FULL DISCLOSURE REVIEW ---
+
+class ReviewDialog(QDialog):
+    # Seek anywhere in the recorded case and play it back from there.
+    # Only the chunks on screen are decompressed, so seeking is instant
+    # however long the case is.
+    SPEEDS = (1, 10)
+
+    def __init__(self, case_id, parent=None, flushed=None):
+        super().__init__(parent)
+        # flushed: optional event set when the recorder has written out
+        # its partial chunk; the index is re-read then
+        self.flushed = flushed
+        self.setWindowTitle(f"Review - case {case_id}")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setStyleSheet("background-color: #121212; color: #DDD;")
+        self.resize(1000, 600)
+        self.reader = DisclosureReader(case_id)
+        self.source = DisclosureSource(self.reader)
 
+        layout = QVBoxLayout(self)
+        head = QHBoxLayout()
+        self.time_label = QLabel(styleSheet="font-size: 18px; font-weight: bold;")
+        head.addWidget(self.time_label)
+        head.addStretch()
+        for speed in self.SPEEDS:
+            btn = QPushButton(f"{speed}x")
+            btn.setFixedSize(50, 30)
+            btn.clicked.connect(lambda _checked, s=speed: self.plot.set_speed(s))
+            head.addWidget(btn)
+        layout.addLayout(head)
 
+        self.plot = MultiLeadECG(window_seconds=6.0, source=self.source)
+        layout.addWidget(self.plot, 1)
 
+        # Slider in whole seconds from the start of the case
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.sliderReleased.connect(self.seek_slider)
+        layout.addWidget(self.slider)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.update_position)
+        self.poll_timer.start(250)
+        self.update_position()
+
+    def seek_slider(self):
+        if self.reader.start_time is not None:
+            self.seek(self.reader.start_time + self.slider.value())
+
+    def seek(self, t):
+        # Fill the window with what led up to t, then play on from t
+        if self.reader.start_time is None:
+            self.reader.refresh()
+            if self.reader.start_time is None:
+                return # nothing recorded yet
+        self.plot.restart_stream()
+        self.source.seek(t - self.plot.window_seconds)
+        self.plot.push_block(0, self.source.read(self.plot.buffer.capacity))
+        self.update_position()
+
+    def update_position(self):
+        if self.flushed is not None and self.flushed.is_set():
+            self.flushed = None
+            self.reader.refresh()
+        if self.reader.start_time is None:
+            self.reader.refresh()
+            if self.reader.start_time is None:
+                self.time_label.setText("Nothing recorded yet")
+                return
+        start = self.reader.start_time
+        self.slider.setMaximum(int(self.reader.end_time - start))
+        t = self.source.time if self.source.time is not None else start
+        if not self.slider.isSliderDown():
+            self.slider.setValue(int(t - start))
+        elapsed = int(t - start)
+        self.time_label.setText(f"{time.strftime('%Y/%m/%d %H:%M:%S', time.localtime(t))}   "
+                                f"+{elapsed // 3600:d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}")
+
+    def done(self, result):
+        self.poll_timer.stop()
+        self.plot.sample_timer.stop()
+        self.reader.close()
+        super().done(result)
+
+class TrendDialog(QDialog):
+    # Hours of HR / SpO2 / NIBP / Resp history. Wheel zooms, drag pans,
+    # double-click returns to the live edge.
+    SPANS = ((1, "1h"), (4, "4h"), (12, "12h"))
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Trends - case {store.case_id}")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setStyleSheet("background-color: #121212; color: #DDD;")
+        self.resize(1000, 600)
+
+        layout = QVBoxLayout(self)
+        head = QHBoxLayout()
+        head.addWidget(QLabel("Trends", styleSheet="font-size: 18px; font-weight: bold;"))
+        head.addStretch()
+        for hours, text in self.SPANS:
+            btn = QPushButton(text)
+            btn.setFixedSize(50, 30)
+            btn.clicked.connect(lambda _checked, h=hours: self.panel.set_span(h * 3600))
+            head.addWidget(btn)
+        live = QPushButton("Live")
+        live.setFixedSize(60, 30)
+        live.clicked.connect(lambda: self.panel.go_live())
+        head.addWidget(live)
+        layout.addLayout(head)
+
+        self.panel = TrendPanel(store)
+        layout.addWidget(self.panel, 1)
+
+    def done(self, result):
+        self.panel.live_timer.stop()
+        self.panel.executor.shutdown()
+        super().done(result)
 
 # --- MAIN MODULE ---
 
+# Seconds without an update before a tile greys out. Charted and derived
+# values (EWS, fluid balance) are entered by hand and never go stale.
+VITALS_STALE_AFTER = {
+    "SpO2": 5, "Resp": 10, "Temp": 30,
+    "NIBP_SYS": 900, "NIBP_DIA": 900, "MAP": 900, # cuff cycles every few minutes
+    "HR": 5, "PR": 5,
+}
+
 class MonitorWidget(QWidget):
-    def __init__(self):
+    def __init__(self, case_id="202401181048"):
         super().__init__()
         # Charcoal Background #121212
         self.setStyleSheet("background-color: #121212; font-family: 'Roboto Condensed', 'Arial Narrow', sans-serif;") 
+        # Numeric vitals: sensors write to the model from their own threads,
+        # the model pushes changed fields to the bound tiles once a frame
+        self.vitals_model = VitalsModel(VITALS_STALE_AFTER, parent=self)
+        self.vitals = self.vitals_model.values # as currently shown
+        self.vitals_model.set_many({
+            "NIBP_SYS": 115, "NIBP_DIA": 77, "MAP": 88,
+            "SpO2": 98, "EWS": 3, "Temp": 36.9, "Resp": 28,
+            "HR": None, "PR": None, # from the ECG beat detector
+            "Intake": 36, "Output": 35, "Defecation": 651, "Urine": 36,
+        })
+        self.tiles = [] # (fields, widget, format)
         self.init_ui()
+        self.vitals_model.changed.connect(self.apply_vitals)
+        self.vitals_model.staleness.connect(self.apply_staleness)
+        # Limits, delays and latching are checked on the alarm thread; the
+        # pill shows the most urgent alarm and acknowledges on click
+        self.alarm_engine = AlarmEngine(beds=1, parent=self)
+        self.vitals_model.changed.connect(lambda changed: self.alarm_engine.set_values(0, changed))
+        self.vitals_model.staleness.connect(lambda flipped: self.alarm_engine.set_stale(0, flipped))
+        self.alarm_engine.changed.connect(self.show_alarms)
+        self.alarm_pill.clicked.connect(lambda: self.alarm_engine.acknowledge(0))
+        self.alarm_engine.start()
+        self.sensors = SimulatedVitals(self.vitals_model)
+        self.sensors.start()
+        
+        # Persist the case: a 1 Hz snapshot of the tiles (the waveform goes
+        # to full disclosure below)
+        self.vitals_store = VitalsStore(case_id)
+        self.ecg_plot.enable_beat_detection("II")
+        self.case_id = case_id
+        # Full disclosure: every lead, continuously, for Review
+        # (a new segment if the case was started with other leads or rate)
+        self.ecg_plot.disclosure = open_segment(case_id, self.ecg_plot.labels, self.ecg_plot.sample_rate)
+        self.sidebar_buttons["Save"].clicked.connect(self.save_disclosure)
+        self.sidebar_buttons["Review"].clicked.connect(self.open_review)
+        self.sidebar_buttons["Trends"].clicked.connect(self.open_trends)
+        self.trend_dialog = None
+        self.vitals_timer = QTimer(self)
+        self.vitals_timer.timeout.connect(self.record_vitals)
+        self.vitals_timer.start(1000)
+
+    def save_disclosure(self):
+        # Commit the chunk in progress so the case is complete on disk
+        if self.ecg_plot.disclosure:
+            self.ecg_plot.disclosure.flush()
+        btn = self.sidebar_buttons["Save"]
+        btn.setText("Saved")
+        QTimer.singleShot(1500, lambda: btn.setText("Save"))
+
+    def open_review(self):
+        # The segment being recorded now. The dialog opens on what is on
+        # disk already and picks up the chunk in progress once it's written.
+        segment, flushed = self.case_id, None
+        if self.ecg_plot.disclosure:
+            flushed = self.ecg_plot.disclosure.request_flush()
+            segment = self.ecg_plot.disclosure.case_id
+        ReviewDialog(segment, self, flushed).show()
+
+    def open_trends(self):
+        if self.trend_dialog is None:
+            self.trend_dialog = TrendDialog(self.vitals_store, self)
+            self.trend_dialog.finished.connect(self.close_trends)
+        self.trend_dialog.show()
+        self.trend_dialog.raise_()
+
+    def close_trends(self):
+        self.trend_dialog = None
+
+    def bind(self, widget, fields, fmt="{}"):
+        # Show model fields in a tile: fmt is filled with their values,
+        # "--" while any is None
+        self.tiles.append((tuple(fields), widget, fmt))
+        return widget
+
+    def apply_vitals(self, changed):
+        values = self.vitals_model.values
+        for fields, widget, fmt in self.tiles:
+            if any(f in changed for f in fields):
+                vals = [values.get(f) for f in fields]
+                widget.set_value("--" if None in vals else fmt.format(*vals))
+
+    def apply_staleness(self, flipped):
+        stale = self.vitals_model.stale
+        for fields, widget, _fmt in self.tiles:
+            if any(f in flipped for f in fields):
+                widget.set_stale(any(stale.get(f, False) for f in fields))
+
+    ALARM_COLORS = {HIGH: "#D32F2F", MEDIUM: "#FFB300", LOW: "#00B0FF"}
+
+    def show_alarms(self, alarms):
+        if not alarms:
+            self.alarm_pill.hide()
+            return
+        top = alarms[0]
+        text = top.message + (f"   +{len(alarms) - 1}" if len(alarms) > 1 else "")
+        if top.acked:
+            # Silenced: still listed, no longer demanding attention
+            style = "background-color: transparent; color: #AAA; border: 1px solid #555;"
+        else:
+            color = "black" if top.priority == MEDIUM else "white"
+            style = f"background-color: {self.ALARM_COLORS[top.priority]}; color: {color}; border: none;"
+        self.alarm_pill.setText(text)
+        self.alarm_pill.setToolTip("\n".join(a.message for a in alarms))
+        self.alarm_pill.setStyleSheet(style + " padding: 5px 15px; border-radius: 15px; font-weight: bold;")
+        self.alarm_pill.show()
+
+    def update_heart_rate(self):
+        # HR from the beat detector; the simulated pulse follows it, so PR
+        # shows the same rate. With the leads off nothing is sent, so the
+        # tiles go stale and the alarm engine reports the leads; without an
+        # R wave for the asystole window the rate is 0.
+        detector = self.ecg_plot.beat_detector
+        if self.ecg_plot.source.leads_off:
+            self.alarm_engine.set_values(0, {"Asystole": 0.0})
+            return
+        if detector.asystole:
+            rate = 0
+        else:
+            hr = detector.heart_rate # None while acquiring the first beats
+            rate = None if hr is None else int(round(hr))
+        self.vitals_model.set_many({"HR": rate, "PR": rate})
+        self.alarm_engine.set_values(0, {"Asystole": 1.0 if detector.asystole else 0.0})
+
+    def record_vitals(self):
+        self.update_heart_rate()
+        now = time.time()
+        for name, val in self.vitals.items():
+            self.vitals_store.record(name, val, now)
+        if self.trend_dialog is not None:
+            self.trend_dialog.panel.append(now, self.vitals)
 
     def init_ui(self):
         # Master Layout: [Nav Sidebar Right] is requested? "System Sidebar runs vertically along the far right edge"
@@ -232,10 +760,10 @@ class MonitorWidget(QWidget):
         
         hl.addStretch()
         
-        # Error Pill
-        err = QLabel("Forehead thermometer bluetooth disconnected")
-        err.setStyleSheet("background-color: #D32F2F; color: white; padding: 5px 15px; border-radius: 15px; font-weight: bold;")
-        hl.addWidget(err)
+        # Alarm Pill (most urgent alarm; click to acknowledge)
+        self.alarm_pill = QPushButton()
+        self.alarm_pill.hide()
+        hl.addWidget(self.alarm_pill)
         
         hl.addStretch()
         
@@ -265,11 +793,10 @@ class MonitorWidget(QWidget):
         nl.addWidget(QLabel("mmHg", styleSheet="color:#666; font-size:10px;"), 0, 1)
         
         # Values
-        val_nibp = QLabel("115/77")
-        val_nibp.setStyleSheet("color: #FFFFFF; font-size: 56px; font-weight: bold;")
-        nl.addWidget(val_nibp, 1, 0, 1, 2)
+        val_nibp = ValueLabel("--", "color: #FFFFFF; font-size: 56px; font-weight: bold;")
+        nl.addWidget(self.bind(val_nibp, ("NIBP_SYS", "NIBP_DIA"), "{}/{}"), 1, 0, 1, 2)
         
-        nl.addWidget(QLabel("MAP: 88", styleSheet="color:#AAA; font-weight:bold;"), 1, 2)
+        nl.addWidget(self.bind(ValueLabel("MAP: --", "color:#AAA; font-weight:bold;"), ("MAP",), "MAP: {}"), 1, 2)
         
         btn_nibp = QPushButton("Start 🩺")
         btn_nibp.setFixedSize(90, 40)
@@ -288,14 +815,14 @@ class MonitorWidget(QWidget):
         spo2 = ModernCard()
         sl = QVBoxLayout(spo2)
         sl.addWidget(QLabel("SpO2 %", styleSheet="color:#00B0FF; font-weight:bold;"))
-        sl.addWidget(QLabel("98", styleSheet="color:#00B0FF; font-size: 48px; font-weight: bold;"))
+        sl.addWidget(self.bind(ValueLabel("--", "color:#00B0FF; font-size: 48px; font-weight: bold;"), ("SpO2",)))
         r2l.addWidget(spo2)
         
         # EWS
         ews = ModernCard()
         el = QVBoxLayout(ews)
         el.addWidget(QLabel("EWS", styleSheet="color:#00B0FF; font-weight:bold;"))
-        el.addWidget(QLabel("3", styleSheet="color:#00B0FF; font-size: 48px; font-weight: bold;"))
+        el.addWidget(self.bind(ValueLabel("--", "color:#00B0FF; font-size: 48px; font-weight: bold;"), ("EWS",)))
         r2l.addWidget(ews)
         
         lcl.addWidget(row2)
@@ -309,14 +836,15 @@ class MonitorWidget(QWidget):
         temp = ModernCard()
         tl = QVBoxLayout(temp)
         tl.addWidget(QLabel("Temp °C", styleSheet="color:#FF9800; font-weight:bold;"))
-        tl.addWidget(QLabel("36.9", styleSheet="color:#FF9800; font-size: 48px; font-weight: bold;"))
+        tl.addWidget(self.bind(ValueLabel("--", "color:#FF9800; font-size: 48px; font-weight: bold;"), ("Temp",), "{:.1f}"))
         r3l.addWidget(temp)
         
         # PR
         pr = ModernCard()
         pl = QVBoxLayout(pr)
         pl.addWidget(QLabel("PR /min", styleSheet="color:#00E676; font-weight:bold;"))
-        pl.addWidget(QLabel("78", styleSheet="color:#00E676; font-size: 48px; font-weight: bold;"))
+        self.pr_label = ValueLabel("--", "color:#00E676; font-size: 48px; font-weight: bold;")
+        pl.addWidget(self.bind(self.pr_label, ("PR",)))
         r3l.addWidget(pr)
         
         lcl.addWidget(row3)
@@ -331,7 +859,8 @@ class MonitorWidget(QWidget):
         # ECG Header
         ecg_head = QHBoxLayout()
         ecg_head.addWidget(QLabel("ECG", styleSheet="color:#DDD; font-size:20px; font-weight:bold;"))
-        ecg_head.addWidget(QLabel("60", styleSheet="color:#00E676; font-size:48px; font-weight:bold;"))
+        self.hr_label = ValueLabel("--", "color:#00E676; font-size:48px; font-weight:bold;")
+        ecg_head.addWidget(self.bind(self.hr_label, ("HR",)))
         ecg_head.addWidget(QLabel("bpm", styleSheet="color:#AAA; margin-top:15px;"))
         ecg_head.addStretch()
         
@@ -343,7 +872,9 @@ class MonitorWidget(QWidget):
         rcl.addLayout(ecg_head)
         
         # Graph
-        self.ecg_plot = MultiLeadECG()
+        # Native 12-lead at 500 Hz: I, II and a horizontal component are
+        # synthesized, the other nine leads are projected from them
+        self.ecg_plot = MultiLeadECG(mode="sweep", source=SimulatedSource(TWELVE_LEADS, sample_rate=500))
         rcl.addWidget(self.ecg_plot)
         
         mid_layout.addWidget(right_col)
@@ -357,14 +888,14 @@ class MonitorWidget(QWidget):
         bl = QHBoxLayout(bottom)
         
         metrics = [
-            ("Breathing", "28", "rpm"),
-            ("Intake", "36", "ml"),
-            ("Output", "35", "ml"),
-            ("Defecation", "651", ""),
-            ("Urine", "36", "ml")
+            ("Breathing", "Resp", "rpm"),
+            ("Intake", "Intake", "ml"),
+            ("Output", "Output", "ml"),
+            ("Defecation", "Defecation", ""),
+            ("Urine", "Urine", "ml")
         ]
         
-        for k, v, s in metrics:
+        for k, field, s in metrics:
             cont = QVBoxLayout()
             cont.setSpacing(2)
             lbl = QLabel(k)
@@ -372,8 +903,8 @@ class MonitorWidget(QWidget):
             lbl.setAlignment(Qt.AlignmentFlag.AlignHCenter)
             cont.addWidget(lbl)
             
-            w = RecessedLabel(v, s)
-            cont.addWidget(w)
+            w = RecessedLabel("--", s)
+            cont.addWidget(self.bind(w, (field,)))
             
             bl.addLayout(cont)
             
@@ -390,7 +921,8 @@ class MonitorWidget(QWidget):
         sl.setSpacing(30)
         sl.setContentsMargins(0, 30, 0, 30)
         
-        menu_items = ["Menu", "Review", "Pat. List", "Save"]
+        menu_items = ["Menu", "Review", "Trends", "Pat. List", "Save"]
+        self.sidebar_buttons = {}
         for txt in menu_items:
             # We don't verify images, assume text for now
             btn = QPushButton(txt)
@@ -411,6 +943,7 @@ class MonitorWidget(QWidget):
                 }
             """)
             sl.addWidget(btn)
+            self.sidebar_buttons[txt] = btn
             
         sl.addStretch()
         main_layout.addWidget(sidebar)
@@ -0,0 +1,207 @@
+import time
+from collections import deque
+
+import numpy as np
+
+# --- QRS DETECTION ---
+# Streaming Pan-Tompkins beat detector for one ECG lead (lead II):
+#
+#   band-pass 5-15 Hz -> derivative -> square -> 150 ms moving integration
+#   -> local maxima -> adaptive signal/noise thresholds, 200 ms refractory
+#   period, search-back for missed beats
+#
+# Band-pass and derivative are folded into one FIR kernel; both FIR stages
+# run with np.convolve over the new block plus the tail of the previous one,
+# so the output is identical however the signal is split into blocks and
+# the state is a few fixed-size arrays. Only candidate peaks of the smooth
+# integrated signal (a handful per second) go through the Python threshold
+# logic. Blocks shorter than min_block are buffered, so the per-call cost is
+# paid a few times a second rather than on every 20 ms display tick.
+
+def bandpass_kernel(sample_rate, low=5.0, high=15.0, seconds=0.2):
+    # Windowed-sinc band-pass, odd length for a whole-sample delay
+    taps = int(seconds * sample_rate) | 1
+    n = np.arange(taps) - (taps - 1) / 2
+    lo, hi = low / sample_rate, high / sample_rate
+    h = 2 * hi * np.sinc(2 * hi * n) - 2 * lo * np.sinc(2 * lo * n)
+    return h * np.hamming(taps)
+
+class QrsDetector:
+    RR_HISTORY = 8          # beats averaged for HR and R-R statistics
+    REFRACTORY = 0.2        # s; no second beat this soon
+    SEARCHBACK = 1.66       # x mean R-R without a beat -> look back for one
+    ASYSTOLE = 3.0          # s without a beat before HR is reported as lost
+
+    def __init__(self, sample_rate, learn_seconds=2.0, min_block=0.25):
+        self.sample_rate = float(sample_rate)
+        fs = self.sample_rate
+        # Pan-Tompkins 5-point derivative, folded into the band-pass
+        self.kernel = np.convolve(bandpass_kernel(fs), np.array([1.0, 2.0, 0.0, -2.0, -1.0]) * fs / 8)
+        self.window = np.ones(max(1, int(0.15 * fs))) / max(1, int(0.15 * fs))
+        # Integrated-signal peaks lag the R wave by both filters' group delay
+        self.delay = (len(self.kernel) - 1) // 2 + (len(self.window) - 1) // 2
+        self.learn_samples = int(learn_seconds * fs)
+        self.min_block = max(1, int(min_block * fs))
+        self.refractory = int(self.REFRACTORY * fs)
+        self.reset()
+
+    def reset(self):
+        self._pending = []
+        self._pending_n = 0
+        self._x_tail = np.zeros(len(self.kernel) - 1)
+        self._sq_tail = np.zeros(len(self.window) - 1)
+        self._y_tail = np.full(2, -np.inf) # last two integrated samples
+        self.samples = 0    # input samples processed
+        self._y_pos = 0     # absolute index of the next integrated sample
+        self._learn = []
+        self.spki = None    # running signal-peak level
+        self.npki = 0.0     # running noise-peak level
+        self.last_beat = None # absolute sample index of the last R peak
+        self._last_peak = 0.0
+        self._missed = None # (value, index) best sub-threshold candidate since last beat
+        self.rr = deque(maxlen=self.RR_HISTORY)
+        self.beats = 0
+
+    @property
+    def threshold(self):
+        return self.npki + 0.25 * (self.spki - self.npki)
+
+    # --- Streaming ---
+
+    def process(self, x):
+        # Feed new samples; returns the sample indices of beats found so far
+        # that were not returned before
+        x = np.asarray(x, dtype=np.float64)
+        if x.size:
+            self._pending.append(x)
+            self._pending_n += x.size
+        if self._pending_n < self.min_block:
+            return []
+        return self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return []
+        x = self._pending[0] if len(self._pending) == 1 else np.concatenate(self._pending)
+        self._pending = []
+        self._pending_n = 0
+
+        xin = np.concatenate((self._x_tail, x))
+        self._x_tail = xin[xin.size - self._x_tail.size:]
+        sq = np.convolve(xin, self.kernel, "valid") ** 2
+        sqin = np.concatenate((self._sq_tail, sq))
+        self._sq_tail = sqin[sqin.size - self._sq_tail.size:]
+        y = np.convolve(sqin, self.window, "valid")
+
+        first = self._y_pos
+        self._y_pos += y.size
+        self.samples += x.size
+
+        if self.spki is None:
+            # Learning phase: set the initial thresholds from the signal
+            self._learn.append(y)
+            if self._y_pos < self.learn_samples:
+                return []
+            seen = np.concatenate(self._learn)
+            self._learn = []
+            self.spki = 0.25 * seen.max()
+            self.npki = 0.5 * seen.mean()
+
+        # Local maxima, including one straddling the previous block
+        z = np.concatenate((self._y_tail, y))
+        self._y_tail = z[-2:]
+        peaks = np.flatnonzero((z[1:-1] > z[:-2]) & (z[1:-1] >= z[2:])) + 1
+        found = []
+        for i in peaks.tolist():
+            found.extend(beat - self.delay for beat in self._classify(z[i], first - 2 + i))
+        return found
+
+    def _classify(self, value, idx):
+        # One candidate peak of the integrated signal; returns the indices
+        # of the beats it yields: a missed beat found by search-back, this
+        # peak, both or neither
+        beats = []
+        if self.last_beat is not None and self.rr and self._missed is not None:
+            mean_rr = sum(self.rr) / len(self.rr)
+            if idx - self.last_beat > self.SEARCHBACK * mean_rr:
+                missed_value, missed_idx = self._missed
+                self.spki = 0.25 * missed_value + 0.75 * self.spki
+                beats.append(self._accept(missed_value, missed_idx))
+
+        if self.last_beat is not None and idx - self.last_beat < self.refractory:
+            # Same QRS complex; keep the larger peak's level
+            if value > self._last_peak:
+                self._last_peak = value
+            return beats
+        if value > self.threshold:
+            self.spki = 0.125 * value + 0.875 * self.spki
+            beats.append(self._accept(value, idx))
+            return beats
+        self.npki = 0.125 * value + 0.875 * self.npki
+        if value > 0.5 * self.threshold and (self._missed is None or value > self._missed[0]):
+            self._missed = (value, idx)
+        return beats
+
+    def _accept(self, value, idx):
+        if self.last_beat is not None:
+            self.rr.append(idx - self.last_beat)
+        self.last_beat = idx
+        self._last_peak = value
+        self._missed = None
+        self.beats += 1
+        return idx
+
+    # --- Results ---
+
+    @property
+    def heart_rate(self):
+        # bpm from the recent R-R intervals; None before two beats or
+        # once no beat has been seen for ASYSTOLE seconds
+        if not self.rr or self.last_beat is None:
+            return None
+        if self._y_pos - self.last_beat > self.ASYSTOLE * self.sample_rate:
+            return None
+        return 60.0 * self.sample_rate * len(self.rr) / sum(self.rr)
+
+    @property
+    def asystole(self):
+        # No R wave for ASYSTOLE seconds: since the last beat, or since
+        # learning ended if there never was one
+        if self.spki is None:
+            return False
+        since = self.learn_samples if self.last_beat is None else self.last_beat
+        return self._y_pos - since > self.ASYSTOLE * self.sample_rate
+
+    def stats(self):
+        rr_ms = np.array(self.rr, dtype=np.float64) * 1000.0 / self.sample_rate
+        return {
+            "heart_rate": None if self.heart_rate is None else round(self.heart_rate, 1),
+            "beats": self.beats,
+            "rr_last_ms": round(float(rr_ms[-1]), 1) if rr_ms.size else None,
+            "rr_mean_ms": round(float(rr_ms.mean()), 1) if rr_ms.size else None,
+            "rr_sd_ms": round(float(rr_ms.std()), 1) if rr_ms.size > 1 else None,
+        }
+
+# --- BENCHMARK ---
+
+def benchmark(seconds=120, sample_rate=500, block_ms=20):
+    # Detection accuracy and cost on the simulated patient, fed the way the
+    # monitor feeds it (one display block at a time)
+    from modules.waveform import SimulatedSource
+    block = int(sample_rate * block_ms / 1000)
+    for bpm in (40, 60, 90, 150, 200):
+        source = SimulatedSource(["II"], heart_rate=bpm, sample_rate=sample_rate, seed=0)
+        signal = source.read(int(seconds * sample_rate))[0]
+        det = QrsDetector(sample_rate)
+        start = time.perf_counter()
+        beats = []
+        for i in range(0, signal.size, block):
+            beats.extend(det.process(signal[i:i + block]))
+        elapsed = time.perf_counter() - start
+        expected = bpm * seconds / 60
+        print(f"{bpm:>4} bpm: HR {det.heart_rate:6.1f}, {len(beats)} beats "
+              f"(~{expected:.0f} incl. {det.learn_samples / sample_rate:g} s learning), "
+              f"{elapsed / seconds * 1e6:.0f} us per second of signal")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,224 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+if __package__ in (None, ""):
+    # Allow `python modules/replay.py ...` as well as `python -m modules.replay`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.waveform import WaveformSource, SimulatedSource, LIMB_LEADS, TWELVE_LEADS, UNITS_PER_MV
+
+# --- WAVEFORM RECORDINGS ---
+# Recordings use the WFDB layout (PhysioNet), restricted to format 16:
+#
+#   <record>.hea   text header
+#       <record> <signals> <sample rate> <samples per signal>
+#       <record>.dat 16 <gain>(<baseline>)/mV ... <description>   (one per signal)
+#   <record>.dat   interleaved little-endian int16 samples, frame by frame
+#
+# so format-16 PhysioNet records (PTB, for one) replay as-is and our own
+# recordings open in the usual WFDB tools. Format-212 records such as
+# MIT-BIH are rejected; convert them to format 16 first (WFDB's xform).
+# ReplaySource memory-maps the .dat file: reading a block touches only the
+# pages it covers, so a 24-hour 12-lead recording (~1 GB at 500 Hz)
+# replays without being loaded into RAM.
+
+REPLAY_SPEEDS = (1, 10, 100)
+DEFAULT_GAIN = 200.0 # ADC units per mV, WFDB's default
+
+# gain, optional (baseline), optional /units
+GAIN_SPEC = re.compile(r"^([-+\d.eE]+)(?:\(([-+\d]+)\))?(?:/(\S+))?$")
+
+class RecordingHeader:
+    def __init__(self, record, sample_rate, num_samples, signals):
+        self.record = record
+        self.sample_rate = sample_rate
+        self.num_samples = num_samples
+        self.signals = signals # [(lead, gain, baseline)]
+
+    @property
+    def leads(self):
+        return [lead for lead, _gain, _baseline in self.signals]
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sample_rate
+
+def record_paths(path):
+    # "dir/case" or "dir/case.hea" or "dir/case.dat" -> (.hea path, .dat path)
+    base, ext = os.path.splitext(path)
+    if ext not in (".hea", ".dat"):
+        base = path
+    return base + ".hea", base + ".dat"
+
+def read_header(path):
+    hea_path, _dat_path = record_paths(path)
+    with open(hea_path, encoding="ascii") as f:
+        lines = [line.split() for line in f if line.strip() and not line.startswith("#")]
+    if not lines:
+        raise ValueError(f"{hea_path}: empty header")
+    record_line = lines[0]
+    if len(record_line) < 4:
+        raise ValueError(f"{hea_path}: record line needs name, signals, sample rate and length")
+    nsig = int(record_line[1])
+    sample_rate = float(record_line[2].split("/")[0])
+    num_samples = int(record_line[3])
+
+    signals = []
+    for fields in lines[1:1 + nsig]:
+        if fields[1] != "16":
+            raise ValueError(f"{hea_path}: only format 16 is supported, got {fields[1]!r}")
+        gain, baseline = DEFAULT_GAIN, 0
+        if len(fields) > 2:
+            m = GAIN_SPEC.match(fields[2])
+            if not m:
+                raise ValueError(f"{hea_path}: bad gain {fields[2]!r}")
+            gain = float(m.group(1)) or DEFAULT_GAIN
+            if m.group(2):
+                baseline = int(m.group(2))
+        # The description is the rest of the line and may contain spaces
+        lead = " ".join(fields[8:]) if len(fields) > 8 else f"ch{len(signals) + 1}"
+        signals.append((lead, gain, baseline))
+    if len(signals) != nsig:
+        raise ValueError(f"{hea_path}: expected {nsig} signal lines, found {len(signals)}")
+    return RecordingHeader(record_line[0], sample_rate, num_samples, signals)
+
+def write_recording(path, leads, sample_rate, blocks, gain=DEFAULT_GAIN):
+    # blocks: iterable of (leads, n) arrays in display units, oldest first.
+    # Streams to disk, so the recording can be longer than memory.
+    hea_path, dat_path = record_paths(path)
+    record = os.path.basename(os.path.splitext(dat_path)[0])
+    scale = gain / UNITS_PER_MV
+    num_samples = 0
+    with open(dat_path, "wb") as f:
+        for block in blocks:
+            adc = np.clip(np.rint(np.asarray(block, dtype=np.float64) * scale), -32768, 32767)
+            f.write(adc.T.astype("<i2").tobytes())
+            num_samples += adc.shape[1]
+    with open(hea_path, "w", encoding="ascii") as f:
+        f.write(f"{record} {len(leads)} {sample_rate:g} {num_samples}\n")
+        for lead in leads:
+            f.write(f"{record}.dat 16 {gain:g}(0)/mV 16 0 0 0 0 {lead}\n")
+    return num_samples
+
+class ReplaySource(WaveformSource):
+    # Plays a recording back through MultiLeadECG at 1x, 10x or 100x.
+    # leads picks and orders signals by name (default: all of them).
+    # With loop=True playback wraps to the start, for soak tests.
+    live = False
+
+    def __init__(self, path, leads=None, speed=1.0, loop=False):
+        self.header = read_header(path)
+        _hea_path, dat_path = record_paths(path)
+        self.samples = np.memmap(dat_path, dtype="<i2", mode="r",
+                                 shape=(self.header.num_samples, len(self.header.signals)))
+        names = self.header.leads
+        if leads is None:
+            leads = names
+        missing = [lead for lead in leads if lead not in names]
+        if missing:
+            raise ValueError(f"recording has no lead(s) {', '.join(missing)}; it has {', '.join(names)}")
+        self.leads = list(leads)
+        cols = [names.index(lead) for lead in self.leads]
+        self.columns = np.array(cols, dtype=np.intp)
+        # Single column slice when the selection is contiguous: no gather
+        if cols == list(range(cols[0], cols[0] + len(cols))):
+            self.columns = slice(cols[0], cols[0] + len(cols))
+        signals = [self.header.signals[c] for c in cols]
+        self.baseline = np.array([b for _l, _g, b in signals], dtype=np.float32)[:, None]
+        self.scale = np.array([UNITS_PER_MV / g for _l, g, _b in signals], dtype=np.float32)[:, None]
+        self.sample_rate = self.header.sample_rate
+        self.speed = float(speed)
+        self.loop = loop
+        self.position = 0 # next sample to play
+
+    @property
+    def duration(self):
+        return self.header.duration
+
+    @property
+    def exhausted(self):
+        return not self.loop and self.position >= self.header.num_samples
+
+    def seek(self, seconds):
+        self.position = int(min(max(seconds, 0.0), self.duration) * self.sample_rate)
+
+    def read(self, n):
+        total = self.header.num_samples
+        parts = []
+        while n > 0 and total:
+            if self.position >= total:
+                if not self.loop:
+                    break
+                self.position = 0
+            end = min(total, self.position + n)
+            parts.append(self.samples[self.position:end, self.columns])
+            n -= end - self.position
+            self.position = end
+        if not parts:
+            return np.empty((len(self.leads), 0), dtype=np.float32)
+        raw = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        out = raw.T.astype(np.float32)
+        out -= self.baseline
+        out *= self.scale
+        return out
+
+    def close(self):
+        # Drop the mapping; the file is unmapped once nothing refers to it.
+        # Blocks already returned by read() are copies and stay valid.
+        self.samples = np.empty((0, len(self.header.signals)), dtype="<i2")
+        self.header.num_samples = 0
+
+# --- COMMAND LINE ---
+
+def simulate(path, seconds, sample_rate, leads=TWELVE_LEADS, seed=0, block_seconds=10):
+    source = SimulatedSource(leads, sample_rate=sample_rate, seed=seed)
+    block = int(block_seconds * sample_rate)
+    total = int(seconds * sample_rate)
+    blocks = (source.read(min(block, total - done)) for done in range(0, total, block))
+    return write_recording(path, source.leads, sample_rate, blocks)
+
+def benchmark(path, speed, seconds=1.0, tick_ms=20):
+    # Pull blocks the way the display does and report the cost per tick
+    source = ReplaySource(path, speed=speed, loop=True)
+    per_tick = max(1, int(source.sample_rate * speed * tick_ms / 1000))
+    ticks = int(seconds * 1000 / tick_ms)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        source.read(per_tick)
+    elapsed = time.perf_counter() - start
+    source.close()
+    print(f"{speed:>4g}x: {per_tick} samples/tick x {len(source.leads)} leads, "
+          f"{elapsed / ticks * 1000:.3f} ms per {tick_ms} ms tick")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect, create or benchmark WFDB (format 16) waveform recordings.")
+    parser.add_argument("record", help="record path, with or without .hea/.dat")
+    parser.add_argument("--simulate", type=float, metavar="SECONDS",
+                        help="write SECONDS of the simulated patient to the record")
+    parser.add_argument("--sample-rate", type=float, default=500)
+    parser.add_argument("--leads", type=int, choices=(6, 12), default=12,
+                        help="lead set for --simulate: limb leads only, or all twelve")
+    parser.add_argument("--benchmark", action="store_true",
+                        help=f"time replay reads at {', '.join(f'{s}x' for s in REPLAY_SPEEDS)}")
+    args = parser.parse_args(argv)
+
+    if args.simulate:
+        start = time.perf_counter()
+        n = simulate(args.record, args.simulate, args.sample_rate,
+                     TWELVE_LEADS if args.leads == 12 else LIMB_LEADS)
+        print(f"wrote {n:,} samples per lead in {time.perf_counter() - start:.1f}s")
+    header = read_header(args.record)
+    print(f"{header.record}: {len(header.signals)} leads ({', '.join(header.leads)}) at "
+          f"{header.sample_rate:g} Hz, {header.num_samples:,} samples = {header.duration / 3600:.2f} h")
+    if args.benchmark:
+        for speed in REPLAY_SPEEDS:
+            benchmark(args.record, speed)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
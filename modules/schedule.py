@@ -0,0 +1,114 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt6.QtGui import QColor
+
+# --- SURGICAL SCHEDULE MODEL ---
+# Rows are pulled from SQLite one keyset page at a time as the view scrolls
+# (canFetchMore / fetchMore). Sorting and filtering are done by the query,
+# so the model only ever holds the pages the user has actually reached.
+
+class ScheduleModel(QAbstractTableModel):
+    HEADERS = ["Date", "Procedure", "Patient", "Status"]
+    PAGE_SIZE = 100
+
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.doctor_id = None
+        self.rows = [] # (op_id, date, procedure, patient, status)
+        self.sort_column = 0
+        self.descending = False
+        self.filter_text = ""
+        self._exhausted = True
+        self._fetching = False
+        # Bumped on every reset so pages from an older query are discarded
+        self._generation = 0
+
+    # --- Query State ---
+
+    def set_doctor(self, doctor_id):
+        self.doctor_id = doctor_id
+        self.refresh()
+
+    def set_filter(self, text):
+        text = text.strip()
+        if text != self.filter_text:
+            self.filter_text = text
+            self.refresh()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+
+    def refresh(self):
+        self._generation += 1
+        self.beginResetModel()
+        self.rows = []
+        self._exhausted = self.doctor_id is None
+        self._fetching = False
+        self.endResetModel()
+        if not self._exhausted:
+            self.fetchMore(QModelIndex())
+
+    # --- Lazy Loading ---
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after = None
+        if self.rows:
+            last = self.rows[-1]
+            after = (last[self.sort_column + 1], last[0])
+        self._fetching = True
+        gen = self._generation
+        self.executor.call("get_operations_page", self.doctor_id, self.sort_column,
+                           self.descending, after, self.PAGE_SIZE, self.filter_text,
+                           on_result=lambda page: self.append_page(gen, page),
+                           on_error=lambda _err: self.on_page_error(gen))
+
+    def append_page(self, gen, page):
+        if gen != self._generation:
+            return
+        self._fetching = False
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        if page:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def on_page_error(self, gen):
+        if gen == self._generation:
+            # Stop paging; the next refresh() starts over
+            self._fetching = False
+            self._exhausted = True
+
+    # --- Model Interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        row = self.rows[index.row()]
+        val = row[index.column() + 1]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return "" if val is None else str(val)
+        if role == Qt.ItemDataRole.ForegroundRole and index.column() == 3 and val == "Pending":
+            return QColor("red")
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return QVariant()
@@ -0,0 +1,334 @@
+import time
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QTimer, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QPolygonF
+
+from modules.executor import QueryExecutor
+from modules.vitals_store import pick_resolution
+
+# --- TREND GRAPHS ---
+# Hours of vitals history, one row per parameter. Each trace is reduced to
+# about one point per pixel column with Largest-Triangle-Three-Buckets
+# (LTTB), which keeps peaks and dips a plain average would flatten.
+#
+# Data comes from the VitalsStore rollup pyramid, never the raw samples:
+# every zoom or pan re-queries the finest level giving at most a few points
+# per pixel, on the QueryExecutor pool, and the stale result of an
+# interrupted drag is dropped. Live samples are appended to the traces as
+# they are recorded.
+
+# (title, unit, y range, [(field, colour)])
+TREND_ROWS = (
+    ("HR", "bpm", (30, 180), (("HR", "#00E676"),)),
+    ("SpO2", "%", (80, 100), (("SpO2", "#00B0FF"),)),
+    ("NIBP", "mmHg", (40, 180), (("NIBP_SYS", "#FFFFFF"), ("NIBP_DIA", "#FFFFFF"), ("MAP", "#888888"))),
+    ("Resp", "rpm", (0, 40), (("Resp", "#FFD54F"),)),
+)
+
+class LttbSeries:
+    # One trace, LTTB-downsampled over fixed time-aligned buckets `width`
+    # seconds wide. Bucket edges don't move as points arrive, so append()
+    # only re-picks the last two buckets: a bucket's pick depends on the
+    # previous pick and the mean of the next bucket, and nothing older
+    # changes. The first bucket keeps its first point and the last bucket
+    # its newest point, so the trace ends on the current value.
+    def __init__(self, width):
+        self.width = float(width)
+        self.t = []
+        self.v = []
+        self.starts = [] # index of each bucket's first point
+        self.picked = [] # index of each bucket's selected point
+        self._bucket = None # id of the last bucket
+
+    def set_data(self, t, v):
+        self.t, self.v = [], []
+        self.starts, self.picked = [], []
+        self._bucket = None
+        for ti, vi in zip(t, v):
+            self._add(ti, vi)
+        for j in range(len(self.starts)):
+            self.picked.append(self._pick(j))
+
+    def append(self, t, v):
+        if v is None or (self.t and t <= self.t[-1]):
+            return
+        self._add(t, v)
+        # A new bucket needs a pick; the last two are re-picked
+        while len(self.picked) < len(self.starts):
+            self.picked.append(0)
+        for j in range(max(0, len(self.starts) - 2), len(self.starts)):
+            self.picked[j] = self._pick(j)
+
+    def _add(self, t, v):
+        bucket = int(t // self.width)
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self.starts.append(len(self.t))
+        self.t.append(t)
+        self.v.append(v)
+
+    def _bounds(self, j):
+        end = self.starts[j + 1] if j + 1 < len(self.starts) else len(self.t)
+        return self.starts[j], end
+
+    def _pick(self, j):
+        lo, hi = self._bounds(j)
+        if j == 0:
+            return lo
+        if j == len(self.starts) - 1:
+            return hi - 1
+        a = self.picked[j - 1]
+        ax, ay = self.t[a], self.v[a]
+        nlo, nhi = self._bounds(j + 1)
+        cx = sum(self.t[nlo:nhi]) / (nhi - nlo)
+        cy = sum(self.v[nlo:nhi]) / (nhi - nlo)
+        best, best_area = lo, -1.0
+        t, v = self.t, self.v
+        for i in range(lo, hi):
+            # Twice the triangle area; only the comparison matters
+            area = abs((ax - cx) * (v[i] - ay) - (ax - t[i]) * (cy - ay))
+            if area > best_area:
+                best, best_area = i, area
+        return best
+
+    def trim(self, before):
+        # Drop whole buckets ending before `before` (live view scrolled past)
+        drop = 0
+        while drop + 1 < len(self.starts) and self.t[self.starts[drop + 1] - 1] < before:
+            drop += 1
+        if drop:
+            cut = self.starts[drop]
+            del self.t[:cut], self.v[:cut]
+            self.starts = [s - cut for s in self.starts[drop:]]
+            self.picked = [p - cut for p in self.picked[drop:]]
+
+    def points(self):
+        return [(self.t[i], self.v[i]) for i in self.picked]
+
+def query_trends(store, fields, start, end, max_points):
+    # Runs on the executor pool: {field: [(t, mean)]} from one pyramid level.
+    # Buckets are drawn at their centre, but never past `end`: the bucket in
+    # progress would otherwise sit up to half a bucket in the future, and
+    # live samples appended before that time would be rejected as old.
+    resolution = pick_resolution(end - start, max_points)
+    rows = {}
+    for field in fields:
+        rows[field] = [(min(ts + resolution / 2, end), mean) for ts, _vmin, _vmax, mean
+                       in store.trend(field, start, end, resolution)]
+    return resolution, rows
+
+class TrendPanel(QWidget):
+    MIN_SPAN = 5 * 60
+    MAX_SPAN = 24 * 3600
+    LABEL_W = 100
+    AXIS_H = 24
+    POINTS_PER_PIXEL = 4 # pyramid rows fetched per pixel column, at most
+
+    def __init__(self, store, span=3600.0, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.executor = QueryExecutor(store, max_threads=1, parent=self)
+        self.fields = [f for _t, _u, _r, traces in TREND_ROWS for f, _c in traces]
+        self.span = float(span)
+        self.end = None # None = live, the right edge follows the clock
+        self.series = {}
+        self.resolution = 1
+        self._task = None
+        self._generation = 0 # of the latest query; older results are dropped
+        self._tail = [] # live samples that arrived while a query was running
+        self._drag = None # (x, end) at mouse press
+        self.setMinimumHeight(300)
+
+        # Coalesce the queries of a zoom or drag into one per event-loop pass
+        self.query_timer = QTimer(self)
+        self.query_timer.setSingleShot(True)
+        self.query_timer.timeout.connect(self.requery)
+        # The live edge moves even when no sample arrives
+        self.live_timer = QTimer(self)
+        self.live_timer.timeout.connect(self.update)
+        self.live_timer.start(1000)
+
+    # --- View ---
+
+    @property
+    def live(self):
+        return self.end is None
+
+    def view(self):
+        end = time.time() if self.end is None else self.end
+        return end - self.span, end
+
+    def plot_width(self):
+        return max(1, self.width() - self.LABEL_W)
+
+    def set_span(self, span):
+        self.span = min(max(float(span), self.MIN_SPAN), self.MAX_SPAN)
+        self.schedule_query()
+
+    def go_live(self):
+        self.end = None
+        self.schedule_query()
+
+    def schedule_query(self):
+        self.update()
+        self.query_timer.start(0)
+
+    def requery(self):
+        if self._task is not None:
+            self._task.cancel()
+        start, end = self.view()
+        self._query_end = end
+        self._tail = []
+        self._generation += 1
+        self._task = self.executor.submit(query_trends, self.fields, start, end,
+                                          self.plot_width() * self.POINTS_PER_PIXEL,
+                                          on_result=lambda r, g=self._generation: self.set_data(r, g))
+
+    def set_data(self, result, generation=None):
+        if generation is not None and generation != self._generation:
+            return
+        self._task = None
+        self.resolution, rows = result
+        width = self.span / self.plot_width()
+        self.series = {}
+        for field in self.fields:
+            series = LttbSeries(width)
+            pts = rows.get(field, [])
+            series.set_data([t for t, _v in pts], [v for _t, v in pts])
+            self.series[field] = series
+        # Samples recorded after the query's end
+        for t, values in self._tail:
+            if t >= self._query_end:
+                self._append_to_series(t, values)
+        self._tail = []
+        self.update()
+
+    # --- Live data ---
+
+    def append(self, t, values):
+        # One recorded snapshot of the tiles ({field: value}); only
+        # re-picks the newest LTTB buckets
+        if not self.live:
+            return
+        if self._task is not None:
+            self._tail.append((t, dict(values)))
+        self._append_to_series(t, values)
+        start, _end = self.view()
+        for series in self.series.values():
+            series.trim(start - series.width)
+        self.update()
+
+    def _append_to_series(self, t, values):
+        for field, series in self.series.items():
+            series.append(t, values.get(field))
+
+    # --- Interaction ---
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return
+        start, end = self.view()
+        new_span = min(max(self.span * 1.25 ** -steps, self.MIN_SPAN), self.MAX_SPAN)
+        if not self.live:
+            # Keep the time under the cursor in place
+            frac = (event.position().x() - self.LABEL_W) / self.plot_width()
+            anchor = start + min(max(frac, 0.0), 1.0) * self.span
+            self.end = anchor + (1 - frac) * new_span
+        self.span = new_span
+        self.schedule_query()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag = (event.position().x(), self.view()[1])
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None:
+            return
+        x0, end0 = self._drag
+        end = end0 - (event.position().x() - x0) * self.span / self.plot_width()
+        self.end = None if end >= time.time() else end
+        self.schedule_query()
+
+    def mouseReleaseEvent(self, event):
+        self._drag = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.go_live()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_query()
+
+    # --- Painting ---
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#121212"))
+        start, end = self.view()
+        w = self.plot_width()
+        row_h = (self.height() - self.AXIS_H) / len(TREND_ROWS)
+        x_scale = w / self.span
+        # A line breaks where the data does (sensor off, case paused)
+        gap = max(3 * self.resolution, 3 * self.span / w)
+
+        # Time grid: a round step giving a line every ~120 px
+        step = next((s for s in (60, 300, 600, 1800, 3600, 7200, 14400) if s * x_scale >= 120), 14400)
+        painter.setFont(QFont("Arial", 9))
+        t = (start // step + 1) * step
+        while t < end:
+            x = self.LABEL_W + (t - start) * x_scale
+            painter.setPen(QPen(QColor("#2A2A2A"), 1))
+            painter.drawLine(QPointF(x, 0), QPointF(x, self.height() - self.AXIS_H))
+            painter.setPen(QColor("#888"))
+            painter.drawText(QRectF(x - 40, self.height() - self.AXIS_H, 80, self.AXIS_H),
+                             Qt.AlignmentFlag.AlignCenter, time.strftime("%H:%M", time.localtime(t)))
+            t += step
+
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for row, (title, unit, (lo, hi), traces) in enumerate(TREND_ROWS):
+            top = row * row_h
+            painter.setPen(QPen(QColor("#333"), 1))
+            painter.drawLine(QPointF(0, top + row_h), QPointF(self.width(), top + row_h))
+            painter.setPen(QColor(traces[0][1]))
+            painter.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+            painter.drawText(QRectF(8, top + 6, self.LABEL_W, 20), Qt.AlignmentFlag.AlignLeft, title)
+            painter.setPen(QColor("#666"))
+            painter.setFont(QFont("Arial", 9))
+            painter.drawText(QRectF(8, top + 26, self.LABEL_W, 16), Qt.AlignmentFlag.AlignLeft, unit)
+            painter.drawText(QRectF(8, top + row_h - 20, self.LABEL_W - 14, 16),
+                             Qt.AlignmentFlag.AlignRight, f"{lo}")
+            painter.drawText(QRectF(8, top + 4, self.LABEL_W - 14, 16), Qt.AlignmentFlag.AlignRight, f"{hi}")
+
+            y_scale = (row_h - 8) / (hi - lo)
+            y_base = top + row_h - 4
+            painter.setClipRect(QRectF(self.LABEL_W, top, w, row_h))
+            for field, colour in traces:
+                series = self.series.get(field)
+                if series is None:
+                    continue
+                line = QPen(QColor(colour), 1.5)
+                dot = QPen(QColor(colour), 5, cap=Qt.PenCapStyle.RoundCap)
+                segments = [QPolygonF()]
+                last_t = None
+                for t, v in series.points():
+                    if last_t is not None and t - last_t > gap:
+                        segments.append(QPolygonF())
+                    segments[-1].append(QPointF(self.LABEL_W + (t - start) * x_scale, y_base - (v - lo) * y_scale))
+                    last_t = t
+                for poly in segments:
+                    # Isolated readings (NIBP cycles) draw as dots
+                    if poly.size() == 1:
+                        painter.setPen(dot)
+                        painter.drawPoint(poly[0])
+                    elif poly.size():
+                        painter.setPen(line)
+                        painter.drawPolyline(poly)
+            painter.setClipping(False)
+
+        if not self.live:
+            painter.setPen(QColor("#FF9800"))
+            painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+            painter.drawText(QRectF(self.width() - 210, 4, 200, 20), Qt.AlignmentFlag.AlignRight,
+                             "HISTORY - double-click for live")
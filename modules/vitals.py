@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# --- VITALS MODEL ---
+# Numeric vitals arrive from sensor threads far faster than anyone can read
+# them. set() / set_many() may be called from any thread and only record
+# the latest value per field under a lock. publish() runs once per display
+# frame on the GUI thread and emits just the fields whose value actually
+# changed since the last frame, so tiles are re-texted and restyled at most
+# once a frame however fast the feed is.
+#
+# A field with a stale_after time that hasn't been updated for that long
+# (sensor disconnected, cuff not cycled) is reported stale, and fresh again
+# on its next update, so its tile can be greyed out.
+
+class VitalsModel(QObject):
+    changed = pyqtSignal(dict)   # {field: value} for fields whose value changed
+    staleness = pyqtSignal(dict) # {field: stale?} for fields that flipped
+
+    def __init__(self, stale_after=None, fps=30, parent=None):
+        super().__init__(parent)
+        self.stale_after = {f: s for f, s in (stale_after or {}).items() if s is not None}
+        self.values = {} # as last published; read on the GUI thread
+        self.stale = {}
+        self._pending = {}
+        self._seen = {} # field -> monotonic time of its last update
+        self._lock = threading.Lock()
+        self.updates = 0 # set() calls, for coalescing stats
+        self.frames = 0  # frames that emitted changes
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.publish)
+        self.timer.start(max(1, int(round(1000 / fps))))
+
+    def set(self, field, value):
+        self.set_many({field: value})
+
+    def set_many(self, values):
+        now = time.monotonic()
+        with self._lock:
+            self._pending.update(values)
+            for field in values:
+                self._seen[field] = now
+            self.updates += len(values)
+
+    def publish(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            seen = {f: self._seen.get(f) for f in self.stale_after}
+        changed = {f: v for f, v in pending.items() if f not in self.values or self.values[f] != v}
+        if changed:
+            self.values.update(changed)
+            self.frames += 1
+            self.changed.emit(changed)
+
+        now = time.monotonic()
+        flips = {}
+        for field, limit in self.stale_after.items():
+            last = seen[field]
+            stale = last is None or now - last > limit
+            if stale != self.stale.get(field, False):
+                self.stale[field] = stale
+                flips[field] = stale
+        if flips:
+            self.staleness.emit(flips)
+
+# --- SIMULATED SENSORS ---
+
+class SimulatedVitals:
+    # Stand-in for the bedside sensors, on its own thread: SpO2 and
+    # respiration rate at sensor rate (25 Hz), and a NIBP cuff reading
+    # every nibp_interval seconds. The forehead thermometer is the
+    # disconnected one, so Temp is never sent.
+    def __init__(self, model, rate_hz=25.0, nibp_interval=300.0, seed=None):
+        self.model = model
+        self.period = 1.0 / rate_hz
+        self.nibp_interval = nibp_interval
+        self.rng = random.Random(seed)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vitals-sensors", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        spo2 = 98.0
+        resp = 16.0
+        next_nibp = time.monotonic()
+        while not self._stop.wait(self.period):
+            spo2 = min(100.0, max(93.0, spo2 + self.rng.gauss(0, 0.05) + (98.0 - spo2) * 0.002))
+            resp = min(30.0, max(8.0, resp + self.rng.gauss(0, 0.03) + (16.0 - resp) * 0.002))
+            self.model.set_many({"SpO2": round(spo2), "Resp": round(resp)})
+            if time.monotonic() >= next_nibp:
+                sys_bp = self.rng.randint(108, 124)
+                dia_bp = self.rng.randint(70, 82)
+                self.model.set_many({"NIBP_SYS": sys_bp, "NIBP_DIA": dia_bp,
+                                     "MAP": round((sys_bp + 2 * dia_bp) / 3)})
+                next_nibp += self.nibp_interval
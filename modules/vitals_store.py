@@ -0,0 +1,231 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from modules.database import CONNECTION_PRAGMAS
+
+# --- VITALS STORAGE ---
+# One sidecar SQLite file per case (vitals/<case_id>.db), kept apart from
+# hospital.db so a 100 Hz sample stream never contends with schedule queries.
+#
+#   vitals_raw     append-only (param, ts, value) samples
+#   vitals_rollup  min / max / sum / count per 1 s, 10 s and 60 s bucket
+#
+# The GUI thread only puts samples on a queue. A writer thread drains it in
+# batches, appends the raw rows and folds the batch into the rollups in the
+# same transaction, so trend queries over a long case read a few thousand
+# rollup rows instead of millions of samples. The rollups form a pyramid
+# ten or six times coarser per level, so any zoom level from minutes to a
+# whole case maps to a few thousand rows at one level.
+
+VITALS_DIR = "vitals"
+ROLLUP_RESOLUTIONS = (1, 10, 60) # seconds
+
+def pick_resolution(span, max_points=5000):
+    # Finest rollup giving at most max_points buckets over span seconds
+    # (falling back to the coarsest)
+    for res in ROLLUP_RESOLUTIONS:
+        if max(span, 0) / res <= max_points:
+            break
+    return res
+
+class VitalsStore:
+    def __init__(self, case_id, directory=VITALS_DIR, flush_interval=0.5, batch_size=5000):
+        self.case_id = str(case_id)
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{self.case_id}.db")
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._flushed = threading.Condition()
+        self._pending = 0 # samples queued but not yet committed
+        self._closed = False
+        self.samples_written = 0
+        self.batches_written = 0
+
+        self._init_schema()
+        self._thread = threading.Thread(target=self._run, name=f"vitals-{self.case_id}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS vitals_raw (
+                param TEXT NOT NULL,
+                ts REAL NOT NULL,
+                value REAL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_vitals_raw_param_ts ON vitals_raw(param, ts)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS vitals_rollup (
+                param TEXT NOT NULL,
+                resolution INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                vmin REAL,
+                vmax REAL,
+                vsum REAL,
+                PRIMARY KEY (param, resolution, bucket)
+            ) WITHOUT ROWID
+        ''')
+        # Cases recorded before a level was added: build it from the finest one
+        finest = ROLLUP_RESOLUTIONS[0]
+        for res in ROLLUP_RESOLUTIONS[1:]:
+            if conn.execute('SELECT 1 FROM vitals_rollup WHERE resolution = ? LIMIT 1', (res,)).fetchone():
+                continue
+            conn.execute('''
+                INSERT OR IGNORE INTO vitals_rollup (param, resolution, bucket, n, vmin, vmax, vsum)
+                SELECT param, ?, bucket * ? / ?, sum(n), min(vmin), max(vmax), sum(vsum)
+                FROM vitals_rollup WHERE resolution = ?
+                GROUP BY param, bucket * ? / ?
+            ''', (res, finest, res, finest, finest, res))
+        conn.close()
+
+    # --- Producer side (any thread, never blocks) ---
+
+    def record(self, param, value, ts=None):
+        self.record_many(param, ((time.time() if ts is None else ts, value),))
+
+    def record_many(self, param, samples):
+        # samples: iterable of (ts, value); ts is wall-clock seconds
+        if self._closed:
+            return
+        samples = list(samples)
+        if samples:
+            with self._flushed:
+                self._pending += len(samples)
+            self._queue.put((param, samples))
+
+    # --- Writer thread ---
+
+    def _run(self):
+        conn = self._connect()
+        while not self._stop.is_set():
+            self._drain(conn, wait=True)
+        # Write out everything queued before close(), batch by batch
+        while self._drain(conn, wait=False):
+            pass
+        conn.close()
+
+    def _drain(self, conn, wait):
+        batch = []
+        count = 0
+        deadline = time.monotonic() + self.flush_interval
+        while count < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if wait and timeout > 0:
+                    item = self._queue.get(timeout=timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            count += len(item[1])
+        if batch:
+            self._write_batch(conn, batch)
+            with self._flushed:
+                self._pending -= count
+                self._flushed.notify_all()
+        return count
+
+    def _write_batch(self, conn, batch):
+        raw = []
+        rollups = {} # (param, resolution, bucket) -> [n, min, max, sum]
+        for param, samples in batch:
+            for ts, value in samples:
+                raw.append((param, ts, value))
+                if value is None:
+                    continue
+                for res in ROLLUP_RESOLUTIONS:
+                    key = (param, res, int(ts // res))
+                    agg = rollups.get(key)
+                    if agg is None:
+                        rollups[key] = [1, value, value, value]
+                    else:
+                        agg[0] += 1
+                        if value < agg[1]: agg[1] = value
+                        if value > agg[2]: agg[2] = value
+                        agg[3] += value
+        conn.execute("BEGIN")
+        try:
+            conn.executemany('INSERT INTO vitals_raw (param, ts, value) VALUES (?, ?, ?)', raw)
+            conn.executemany('''
+                INSERT INTO vitals_rollup (param, resolution, bucket, n, vmin, vmax, vsum)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (param, resolution, bucket) DO UPDATE SET
+                    n = n + excluded.n,
+                    vmin = min(vmin, excluded.vmin),
+                    vmax = max(vmax, excluded.vmax),
+                    vsum = vsum + excluded.vsum
+            ''', [k + tuple(v) for k, v in rollups.items()])
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            print(f"Warning: dropped {len(raw)} vitals samples: {e}")
+            return
+        self.samples_written += len(raw)
+        self.batches_written += 1
+
+    # --- Lifecycle ---
+
+    def flush(self, timeout=5.0):
+        # Block until everything queued so far is committed
+        end = time.monotonic() + timeout
+        with self._flushed:
+            while self._pending > 0:
+                left = end - time.monotonic()
+                if left <= 0 or not self._thread.is_alive():
+                    return False
+                self._flushed.wait(left)
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        atexit.unregister(self.close)
+
+    # --- Queries ---
+
+    def trend(self, param, start, end, resolution=None, max_points=5000):
+        # Returns [(bucket start ts, min, max, mean)]. Without an explicit
+        # resolution, the finest rollup giving at most max_points buckets is
+        # used (falling back to the coarsest). resolution=0 reads raw samples.
+        if resolution is None:
+            resolution = pick_resolution(end - start, max_points)
+        conn = self._connect()
+        try:
+            if resolution == 0:
+                rows = conn.execute('''
+                    SELECT ts, value, value, value FROM vitals_raw
+                    WHERE param = ? AND ts >= ? AND ts < ? ORDER BY ts
+                ''', (param, start, end)).fetchall()
+            else:
+                rows = conn.execute('''
+                    SELECT bucket * ?, vmin, vmax, vsum / n FROM vitals_rollup
+                    WHERE param = ? AND resolution = ? AND bucket >= ? AND bucket < ?
+                    ORDER BY bucket
+                ''', (resolution, param, resolution, int(start // resolution),
+                      int(-(-end // resolution)))).fetchall()
+        finally:
+            conn.close()
+        return rows
+
+    def raw(self, param, start, end):
+        return self.trend(param, start, end, resolution=0)
@@ -0,0 +1,411 @@
+import time
+import numpy as np
+
+# --- WAVEFORM BUFFERS ---
+
+class RingBuffer:
+    # Fixed-size (channels, capacity) sample history.
+    # Every sample is written twice, at i and i + capacity, so the newest
+    # `capacity` samples are always one contiguous slice: view() is a
+    # zero-copy window, oldest -> newest, and a write is O(1) per sample
+    # whatever the capacity.
+    def __init__(self, channels, capacity, dtype=np.float32):
+        self.channels = channels
+        self.capacity = capacity
+        self._buf = np.zeros((channels, 2 * capacity), dtype=dtype)
+        self._idx = 0 # next write position in [0, capacity)
+        self.total_written = 0
+
+    def append(self, sample):
+        # sample: one value per channel
+        i = self._idx
+        self._buf[:, i] = sample
+        self._buf[:, i + self.capacity] = sample
+        self._idx = (i + 1) % self.capacity
+        self.total_written += 1
+
+    def extend(self, block):
+        # block: (channels, n) array, oldest sample first
+        block = np.asarray(block, dtype=self._buf.dtype)
+        n = block.shape[1]
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the newest `capacity` samples survive
+            block = block[:, -self.capacity:]
+            self._buf[:, :self.capacity] = block
+            self._buf[:, self.capacity:] = block
+            self._idx = 0
+            self.total_written += n
+            return
+        i = self._idx
+        first = min(n, self.capacity - i)
+        self._buf[:, i:i + first] = block[:, :first]
+        self._buf[:, i + self.capacity:i + self.capacity + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            self._buf[:, :rest] = block[:, first:]
+            self._buf[:, self.capacity:self.capacity + rest] = block[:, first:]
+        self._idx = (i + n) % self.capacity
+        self.total_written += n
+
+    def view(self):
+        # (channels, capacity), read-only, no copy
+        v = self._buf[:, self._idx:self._idx + self.capacity]
+        v.flags.writeable = False
+        return v
+
+    def latest(self, n):
+        # Newest n samples per channel, no copy
+        return self.view()[:, self.capacity - min(n, self.capacity):]
+
+    def clear(self):
+        self._buf.fill(0)
+        self._idx = 0
+        self.total_written = 0
+
+# --- SAMPLE CLOCK ---
+
+class SampleScheduler:
+    # Decides how many samples are due at each timer tick from the monotonic
+    # nanosecond clock, never from the tick count. Integer arithmetic keeps
+    # hours of signal exactly on rate; a late tick simply gets a larger block.
+    # Metrics: ticks whose deadline was missed, worst lateness, and samples
+    # skipped when a stall exceeds max_catchup (e.g. after a suspend) so the
+    # display resumes live instead of fast-forwarding.
+    def __init__(self, sample_rate, tick_ms, max_catchup=1.0, clock=time.monotonic_ns):
+        self.clock = clock
+        self.tick_ns = int(tick_ms * 1_000_000)
+        self.max_catchup = max_catchup
+        self.sample_rate = int(sample_rate)
+        self.reset()
+
+    def reset(self):
+        self.start_ns = self.clock()
+        self.last_tick_ns = self.start_ns
+        self.produced = 0        # samples handed out (including skipped ones)
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.max_late_ms = 0.0
+        self.samples_skipped = 0
+
+    def set_sample_rate(self, hz):
+        self.sample_rate = int(hz)
+        self.reset()
+
+    def due(self):
+        now = self.clock()
+        self.ticks += 1
+        # A tick is late once it slips more than half an interval past its slot
+        late_ns = now - self.last_tick_ns - self.tick_ns
+        if late_ns > self.tick_ns // 2:
+            self.missed_deadlines += 1
+            self.max_late_ms = max(self.max_late_ms, late_ns / 1e6)
+        self.last_tick_ns = now
+
+        target = (now - self.start_ns) * self.sample_rate // 1_000_000_000
+        n = target - self.produced
+        limit = int(self.max_catchup * self.sample_rate)
+        if n > limit:
+            self.samples_skipped += n - limit
+            self.produced += n - limit
+            n = limit
+        if n > 0:
+            self.produced += n
+            return n
+        return 0
+
+    def metrics(self):
+        return {
+            "ticks": self.ticks,
+            "missed_deadlines": self.missed_deadlines,
+            "max_late_ms": round(self.max_late_ms, 2),
+            "samples_skipped": self.samples_skipped,
+            "samples": self.produced,
+        }
+
+# --- ECG SYNTHESIS ---
+# Normal sinus rhythm built from Gaussian waves. Times are seconds at 60 bpm,
+# measured from the start of the beat; the R peak sits at 0.25 s.
+#   P: atrial depolarisation, round and small
+#   QRS: ventricular depolarisation, sharp and tall
+#   T: ventricular repolarisation, asymmetric (two overlapping Gaussians)
+# (center, amplitude, width)
+BEAT_WAVES = {
+    "P":  (0.15, 4.0, 0.02),
+    "Q":  (0.23, -3.0, 0.005),
+    "R":  (0.25, 35.0, 0.007),
+    "S":  (0.27, -8.0, 0.007),
+    "T":  (0.48, 6.0, 0.06),  # main body
+    "T2": (0.52, 3.0, 0.04),  # skew: slower rise, steeper drop
+}
+# Anteroposterior (horizontal-plane) component: small early r, deep S and
+# a flat, slightly negative T, i.e. what V1 sees
+HORIZONTAL_WAVES = {
+    "P":  (0.15, 1.5, 0.02),
+    "R":  (0.235, 6.0, 0.006),
+    "S":  (0.262, -28.0, 0.01),
+    "T":  (0.48, -2.0, 0.06),
+}
+R_PEAK = 0.25
+# Waves whose timing follows the R-R interval (Bazett: QT ~ sqrt(RR)).
+# The QRS complex keeps its width at any rate.
+RATE_SCALED_WAVES = ("P", "T", "T2")
+
+# Only these are synthesized; every displayed lead is a fixed linear
+# combination of them. (gain, waves)
+BASIS_SIGNALS = {
+    "I":  (0.7, BEAT_WAVES),       # Lateral
+    "II": (1.0, BEAT_WAVES),       # Inferior - classic view, reference
+    "Z":  (1.0, HORIZONTAL_WAVES), # Anteroposterior
+}
+BASIS_LEADS = tuple(BASIS_SIGNALS)
+
+# Limb leads from I and II (Einthoven: I + III = II; Goldberger augmented
+# leads), as weights on (I, II, Z)
+LIMB_PROJECTION = {
+    "I":   (1.0, 0.0, 0.0),
+    "II":  (0.0, 1.0, 0.0),
+    "III": (-1.0, 1.0, 0.0),
+    "aVR": (-0.5, -0.5, 0.0),
+    "aVL": (1.0, -0.5, 0.0),
+    "aVF": (-0.5, 1.0, 0.0),
+}
+# Chest leads sweep from the anteroposterior view (V1: rS) to the lateral
+# one (V6: qR), with the R/S transition around V3-V4. Pass a different
+# table to EcgEngine to model another axis or electrode placement.
+PRECORDIAL_PROJECTION = {
+    "V1": (0.1, 0.0, 1.0),
+    "V2": (0.3, 0.1, 0.9),
+    "V3": (0.6, 0.2, 0.6),
+    "V4": (1.0, 0.3, 0.35),
+    "V5": (1.1, 0.3, 0.15),
+    "V6": (1.0, 0.2, 0.0),
+}
+LIMB_LEADS = list(LIMB_PROJECTION)
+PRECORDIAL_LEADS = list(PRECORDIAL_PROJECTION)
+TWELVE_LEADS = LIMB_LEADS + PRECORDIAL_LEADS
+# Display units are the synthesis units above; lead II's R wave is ~1 mV
+UNITS_PER_MV = 35.0
+
+TEMPLATE_POINTS = 1024 # lookup-table resolution per beat
+
+def gaussian(x, mean, amp, width):
+    return amp * np.exp(-((x - mean) ** 2) / (2 * width ** 2))
+
+def lead_matrix(leads, precordial=None):
+    # (len(leads), len(BASIS_LEADS)): row i turns basis samples into lead i
+    table = dict(LIMB_PROJECTION)
+    table.update(PRECORDIAL_PROJECTION if precordial is None else precordial)
+    unknown = [lead for lead in leads if lead not in table]
+    if unknown:
+        raise ValueError(f"no projection for lead(s) {', '.join(unknown)}")
+    return np.array([table[lead] for lead in leads], dtype=np.float64)
+
+def basis_templates(heart_rate):
+    # One beat per basis signal sampled at TEMPLATE_POINTS + 1 points:
+    # (basis, TEMPLATE_POINTS + 1). The extra column repeats column 0 so
+    # interpolation across the beat boundary needs no wrap logic.
+    rr = 60.0 / heart_rate
+    scale = np.sqrt(rr)
+    t = np.linspace(0.0, rr, TEMPLATE_POINTS + 1)
+    out = np.zeros((len(BASIS_LEADS), t.size))
+    for i, (gain, beat_waves) in enumerate(BASIS_SIGNALS.values()):
+        waves = []
+        for name, (center, amp, width) in beat_waves.items():
+            if name in RATE_SCALED_WAVES:
+                center = R_PEAK + (center - R_PEAK) * scale
+                width = width * scale
+            waves.append((center, amp * gain, width))
+        # Sum neighbouring beats too, so long T tails wrap smoothly
+        for shift in (-rr, 0.0, rr):
+            for center, amp, width in waves:
+                out[i] += gaussian(t, center + shift, amp, width)
+    return out
+
+class EcgEngine:
+    # Builds one beat template per basis signal as a lookup table whenever
+    # the heart rate changes. Each block interpolates the basis (plus
+    # wander and noise, so derived leads share them as real ones do) and
+    # projects it onto every requested lead with one matrix multiply, so
+    # 12 leads cost little more than 3.
+    def __init__(self, leads=LIMB_LEADS, heart_rate=60.0, sample_rate=100.0,
+                 noise=0.35, wander=1.5, wander_hz=0.25, precordial=None, seed=None):
+        self.leads = list(leads)
+        self.matrix = lead_matrix(self.leads, precordial)
+        self.sample_rate = float(sample_rate)
+        self.noise = noise
+        self.wander = wander
+        self.wander_hz = wander_hz
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(len(BASIS_LEADS))[:, None]
+        self.phase = 0.0       # position within the current beat, 0..1
+        self.samples_done = 0  # signal clock, in samples
+        self.heart_rate = None
+        self.templates = None
+        self.set_heart_rate(heart_rate)
+
+    @property
+    def rr(self):
+        return 60.0 / self.heart_rate
+
+    def set_heart_rate(self, bpm):
+        bpm = float(bpm)
+        if bpm != self.heart_rate:
+            self.heart_rate = bpm
+            self.templates = self.build_templates()
+
+    def set_sample_rate(self, hz):
+        # Keeps the signal clock (in seconds) continuous
+        hz = float(hz)
+        self.samples_done = int(self.samples_done * hz / self.sample_rate)
+        self.sample_rate = hz
+
+    def build_templates(self):
+        return basis_templates(self.heart_rate)
+
+    def generate(self, n):
+        # Next n samples for every lead: (leads, n) float32
+        if n <= 0:
+            return np.empty((len(self.leads), 0), dtype=np.float32)
+        k = np.arange(1, n + 1)
+        beat_phase = self.phase + k * (1.0 / (self.sample_rate * self.rr))
+        pos = (beat_phase % 1.0) * TEMPLATE_POINTS
+        i0 = pos.astype(np.intp)
+        frac = pos - i0
+        tpl = self.templates
+        basis = tpl[self._rows, i0] * (1.0 - frac) + tpl[self._rows, i0 + 1] * frac
+
+        # Baseline wander (respiration) on the signal clock, plus micro-tremor
+        # noise; derived leads sum the basis noise, so it is kept small here
+        t = (self.samples_done + k) / self.sample_rate
+        basis += self.wander * np.sin(2 * np.pi * self.wander_hz * t)
+        if self.noise:
+            basis += self.rng.uniform(-self.noise, self.noise, basis.shape)
+
+        self.phase = float(beat_phase[-1] % 1.0)
+        self.samples_done += n
+        return (self.matrix @ basis).astype(np.float32)
+
+class EcgBank:
+    # Many simulated patients generated together, e.g. every bed on a
+    # central station. Basis templates are stacked as (beds, basis, points),
+    # so one generate() call interpolates all beds in a single NumPy pass
+    # instead of one EcgEngine per bed. Beds start at random points in
+    # the beat and breathing cycle so the station doesn't beat in unison.
+    def __init__(self, beds, leads=("II",), heart_rates=60.0, sample_rate=250.0,
+                 noise=0.35, wander=1.5, wander_hz=0.25, precordial=None, seed=None):
+        self.beds = beds
+        self.leads = list(leads)
+        self.matrix = lead_matrix(self.leads, precordial)
+        self.sample_rate = float(sample_rate)
+        self.noise = noise
+        self.wander = wander
+        self.wander_hz = wander_hz
+        self.rng = np.random.default_rng(seed)
+        self.phase = self.rng.random(beds)
+        self.wander_phase = self.rng.random(beds)[:, None, None] * 2 * np.pi
+        self.samples_done = 0
+        self._bed_idx = np.arange(beds)[:, None, None]
+        self._basis_idx = np.arange(len(BASIS_LEADS))[None, :, None]
+        self.heart_rates = np.full(beds, np.nan)
+        self.templates = np.empty((beds, len(BASIS_LEADS), TEMPLATE_POINTS + 1))
+        for bed, bpm in enumerate(np.broadcast_to(np.asarray(heart_rates, float), (beds,))):
+            self.set_heart_rate(bed, bpm)
+
+    def set_heart_rate(self, bed, bpm):
+        bpm = float(bpm)
+        if bpm != self.heart_rates[bed]:
+            self.heart_rates[bed] = bpm
+            self.templates[bed] = basis_templates(bpm)
+
+    def generate(self, n):
+        # Next n samples for every bed and lead: (beds, leads, n) float32
+        if n <= 0:
+            return np.empty((self.beds, len(self.leads), 0), dtype=np.float32)
+        k = np.arange(1, n + 1)
+        beats_per_sample = self.heart_rates / 60.0 / self.sample_rate
+        beat_phase = self.phase[:, None] + beats_per_sample[:, None] * k
+        pos = ((beat_phase % 1.0) * TEMPLATE_POINTS)[:, None, :]
+        i0 = pos.astype(np.intp)
+        frac = pos - i0
+        tpl = self.templates
+        basis = (tpl[self._bed_idx, self._basis_idx, i0] * (1.0 - frac)
+                 + tpl[self._bed_idx, self._basis_idx, i0 + 1] * frac)
+
+        t = (self.samples_done + k) / self.sample_rate
+        basis += self.wander * np.sin(2 * np.pi * self.wander_hz * t + self.wander_phase)
+        if self.noise:
+            basis += self.rng.uniform(-self.noise, self.noise, basis.shape)
+
+        self.phase = beat_phase[:, -1] % 1.0
+        self.samples_done += n
+        return (self.matrix @ basis).astype(np.float32)
+
+# --- WAVEFORM SOURCES ---
+
+class WaveformSource:
+    # Anything MultiLeadECG can display. read(n) returns the next n samples
+    # of every lead as a (leads, n) float32 array in display units; a finite
+    # source returns fewer (eventually zero) samples once it runs out.
+    # speed is signal seconds played per wall-clock second, so the display
+    # asks for sample_rate * speed samples a second. live sources are the
+    # patient in front of us and are the only ones persisted. leads_off is
+    # the source's lead status: set while the electrodes are disconnected.
+    leads = ()
+    sample_rate = 0.0
+    speed = 1.0
+    live = True
+    leads_off = False
+
+    def read(self, n):
+        raise NotImplementedError
+
+    def set_sample_rate(self, hz):
+        raise ValueError(f"{type(self).__name__} has a fixed sample rate of {self.sample_rate:g} Hz")
+
+    def close(self):
+        pass
+
+class SimulatedSource(WaveformSource):
+    # The built-in synthetic patient; arguments are passed to EcgEngine
+    def __init__(self, leads=LIMB_LEADS, **engine_args):
+        self.engine = EcgEngine(leads, **engine_args)
+        self.leads = self.engine.leads
+
+    @property
+    def sample_rate(self):
+        return self.engine.sample_rate
+
+    def set_sample_rate(self, hz):
+        self.engine.set_sample_rate(hz)
+
+    def read(self, n):
+        return self.engine.generate(n)
+
+# --- TRACE GEOMETRY ---
+
+def minmax_decimate(values, x_step, x0=0.0):
+    # values: (..., n), e.g. (leads, n) to decimate every lead in one pass.
+    # Sample j is drawn at x0 + j * x_step. When more than two samples fall
+    # on one pixel column, only that column's min and max are kept, so a
+    # QRS spike narrower than a pixel still reaches its full height and a
+    # trace never needs more than ~2 points per pixel of width. Each column
+    # starts with whichever extreme is nearer the value it was entered at,
+    # which keeps the polyline from zig-zagging on slow slopes.
+    # Returns (xs, ys): xs is shared by all rows, ys has values' leading shape.
+    n = values.shape[-1]
+    j = np.arange(n)
+    if x_step >= 0.5 or n < 3:
+        return x0 + j * x_step, values
+    col = np.floor(x0 + j * x_step).astype(np.intp)
+    starts = np.flatnonzero(np.r_[True, col[1:] != col[:-1]])
+    lo = np.minimum.reduceat(values, starts, axis=-1)
+    hi = np.maximum.reduceat(values, starts, axis=-1)
+    entry = values[..., starts]
+    max_first = hi - entry < entry - lo
+    xs = np.repeat(col[starts].astype(np.float64), 2)
+    ys = np.empty(values.shape[:-1] + (2 * starts.size,), dtype=np.float64)
+    ys[..., 0::2] = np.where(max_first, hi, lo)
+    ys[..., 1::2] = np.where(max_first, lo, hi)
+    return xs, ys
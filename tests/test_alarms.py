@@ -0,0 +1,65 @@
+import unittest
+
+from modules.alarms import AlarmEngine, AlarmLimit, BELOW, HIGH, MEDIUM, TECHNICAL
+
+class AlarmAcknowledgeTest(unittest.TestCase):
+    # SpO2 is latching, HIGH, with a 10 s onset delay and a probe sensor
+    def setUp(self):
+        self.engine = AlarmEngine(beds=1)
+        self.now = 0.0
+
+    def run_for(self, seconds, **values):
+        if values:
+            self.engine.set_values(0, values)
+        end = self.now + seconds
+        while self.now < end:
+            self.now += 0.25
+            self.engine.tick(self.now)
+        return [(a.field, a.kind, a.priority, a.acked, a.latched) for a in self.engine.alarms]
+
+    def acknowledge(self):
+        self.engine.acknowledge(0)
+        self.engine.tick(self.now)
+        return [(a.field, a.kind, a.acked) for a in self.engine.alarms]
+
+    def test_acknowledged_latching_alarm_clears_with_its_condition(self):
+        self.assertEqual(self.run_for(15, SpO2=80), [("SpO2", BELOW, HIGH, False, False)])
+        self.assertEqual(self.acknowledge(), [("SpO2", BELOW, True)])
+        self.assertEqual(self.run_for(5, SpO2=97), [])
+
+    def test_unacknowledged_latching_alarm_stays_up(self):
+        self.run_for(15, SpO2=80)
+        self.assertEqual(self.run_for(5, SpO2=97), [("SpO2", BELOW, HIGH, False, True)])
+        self.assertEqual(self.acknowledge(), [])
+
+    def test_new_episode_after_acknowledge_annunciates_again(self):
+        self.run_for(15, SpO2=80)
+        self.acknowledge()
+        self.run_for(3600, SpO2=97)
+        self.assertEqual(self.run_for(15, SpO2=80), [("SpO2", BELOW, HIGH, False, False)])
+
+    def test_new_episode_of_latched_alarm_escalates_from_its_own_onset(self):
+        self.engine = AlarmEngine(beds=1, limits={"Resp": AlarmLimit(8, 30, delay=10, latching=True)})
+        self.run_for(15, Resp=5)
+        self.run_for(300, Resp=16)
+        # Still latched and unacknowledged: escalated by now
+        self.assertEqual(self.run_for(0.25), [("Resp", BELOW, HIGH, False, True)])
+        self.assertEqual(self.run_for(15, Resp=5), [("Resp", BELOW, MEDIUM, False, False)])
+
+    def test_limit_acknowledge_does_not_silence_sensor_off(self):
+        self.run_for(15, SpO2=80)
+        self.acknowledge()
+        self.engine.set_stale(0, {"SpO2": True})
+        self.assertEqual(self.run_for(1), [("SpO2", TECHNICAL, MEDIUM, False, False)])
+
+    def test_sensor_off_acknowledge_lasts_until_reconnect(self):
+        self.engine.set_stale(0, {"SpO2": True})
+        self.run_for(1)
+        self.assertEqual(self.acknowledge(), [("SpO2", TECHNICAL, True)])
+        self.engine.set_stale(0, {"SpO2": False})
+        self.assertEqual(self.run_for(1, SpO2=97), [])
+        self.engine.set_stale(0, {"SpO2": True})
+        self.assertEqual(self.run_for(1), [("SpO2", TECHNICAL, MEDIUM, False, False)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,18 +8,28 @@ from PyQt6.QtCore import Qt
 from modules.patient import PatientWidget
 from modules.doctor import DoctorWidget
 from modules.monitor import MonitorWidget
+from modules.central import CentralStation
 from modules.machines import MachinesWidget
 from modules.environment import EnvironmentWidget
+from modules.database import DatabaseManager
+from modules.executor import QueryExecutor
+from modules.audit import AuditLog
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, db=None, executor=None, audit=None):
         super().__init__()
+        # One DatabaseManager for the whole window, handed to every data page.
+        # Pages load through the executor so queries stay off the GUI thread.
+        self.db = db if db is not None else DatabaseManager()
+        self.executor = executor if executor is not None else QueryExecutor(self.db, parent=self)
+        self.audit = audit if audit is not None else AuditLog(self.db)
         self.setWindowTitle("Smart OR System V6")
         self.showFullScreen() 
         self.init_ui()
         
         # Gesture State for Toggles
         self.last_gesture = 0
+        self.last_audited_gesture = 0
 
     def init_ui(self):
         central_widget = QWidget()
@@ -34,6 +44,12 @@ class MainWindow(QMainWindow):
         self.sidebar = EnvironmentWidget()
         self.sidebar.gesture_signal.connect(self.handle_gesture)
         main_h_layout.addWidget(self.sidebar)
+        
+        # Audit every environment setpoint change (drag or gesture)
+        for name, ctl in [("temperature", self.sidebar.temp_slider), ("humidity", self.sidebar.hum_slider),
+                          ("lighting", self.sidebar.light_slider), ("pressure", self.sidebar.press_slider)]:
+            ctl['slider'].valueChanged.connect(
+                lambda v, n=name, u=ctl['unit']: self.audit.log("environment", n, value=v, unit=u))
 
         # 2. Right Content
         right_area = QWidget()
@@ -117,7 +133,7 @@ class MainWindow(QMainWindow):
         self.nav_group = QButtonGroup(self)
         self.nav_group.setExclusive(True)
         
-        btn_names = ["PATIENT", "SURGEON", "MONITOR", "DEVICES"]
+        btn_names = ["PATIENT", "SURGEON", "MONITOR", "DEVICES", "STATION"]
         self.nav_buttons = []
         
         for i, name in enumerate(btn_names):
@@ -138,16 +154,26 @@ class MainWindow(QMainWindow):
         # B. Stack
         self.stack = QStackedWidget()
         self.patient_page = PatientWidget()
-        self.doctor_page = DoctorWidget()
+        self.doctor_page = DoctorWidget(self.executor)
         self.monitor_page = MonitorWidget()
         self.machines_page = MachinesWidget()
+        self.station_page = CentralStation(beds=8)
         
         self.stack.addWidget(self.patient_page)
         self.stack.addWidget(self.doctor_page)
         self.stack.addWidget(self.monitor_page)
         self.stack.addWidget(self.machines_page)
+        self.stack.addWidget(self.station_page)
         
         right_layout.addWidget(self.stack)
+        
+        # Audit device power changes, whether clicked or toggled by gesture
+        grid = self.machines_page.grid
+        for i in range(grid.count()):
+            card = grid.itemAt(i).widget()
+            if hasattr(card, 'power_btn'):
+                card.power_btn.clicked.connect(
+                    lambda on, n=card.name: self.audit.log("device", "power_on" if on else "power_off", machine=n))
         main_h_layout.addWidget(right_area)
 
         # Default
@@ -155,6 +181,8 @@ class MainWindow(QMainWindow):
         self.stack.setCurrentIndex(2)
 
     def display_page(self, index):
+        if self.stack.currentIndex() != index:
+            self.audit.log("navigation", "display_page", page=self.nav_buttons[index].text())
         self.stack.setCurrentIndex(index)
         self.nav_buttons[index].setChecked(True)
 
@@ -165,6 +193,11 @@ class MainWindow(QMainWindow):
             self.showFullScreen()
 
     def handle_gesture(self, finger_count):
+        # The camera emits on every stable frame; record each new gesture once
+        if finger_count != self.last_audited_gesture:
+            self.last_audited_gesture = finger_count
+            self.audit.log("gesture", "fingers", count=finger_count)
+        
         if finger_count == 0:
             self.last_gesture = 0
             return